@@ -14,9 +14,12 @@ class GUI:
     END_TIME = 180
     MENU_SCREEN_TEXT = "Welcome to Boggle!\nDo you want to play a game?"
 
-    def __init__(self, game, board: list[list[str]]):
-        """Initializes the connection between the GUI and the game."""
+    def __init__(self, game, board: list[list[str]], instrumentation=None):
+        """Initializes the connection between the GUI and the game.
+        :param instrumentation: optional GuiInstrumentation recording the
+        latency of the GUI events"""
         self.__game = game
+        self.__instrumentation = instrumentation
         self.__board = board
         self.__num_words = 0
         self.__opening_screen_text = self.MENU_SCREEN_TEXT
@@ -56,6 +59,9 @@ class GUI:
         Calls the game's event_from_gui method with the event type "click_tile"
         and the coordinates of the tile as event data."""
 
+        if self.__instrumentation is not None:
+            start = self.__instrumentation.start()
+
         tile_tag = event.widget.gettags(CURRENT)[0]
         # Tile tag is in the format "tile_y_x" where y and x are the coordinates of the tile
         y, x = tile_tag.split("_")[1:]
@@ -69,14 +75,55 @@ class GUI:
                                     event_data=coordinate_dict
                                 ):
             self.__canvas.itemconfig(f"tile_{y}_{x}", fill="#92cff0")
-                
+
+        if self.__instrumentation is not None:
+            self.__instrumentation.record("click_tile", start)
+            self.__instrumentation.record_after_render(
+                self.__root, "click_tile_render", start
+            )
+
+    def __press_key(self, event) -> None:
+        """Handles key presses.
+        Letters are sent to the game's event_from_gui method with the event
+        type "type_letter", BackSpace as "erase_letter" and Return adds the
+        current word."""
+        if event.keysym == "Return":
+            self.__click_add_button()
+            return
+
+        if self.__instrumentation is not None:
+            start = self.__instrumentation.start()
+
+        if event.keysym == "BackSpace":
+            self.__game.event_from_gui(event_type="erase_letter", event_data=None)
+        elif len(event.char) == 1 and event.char.isalpha():
+            self.__game.event_from_gui(
+                                    event_type="type_letter",
+                                    event_data={"letter": event.char.upper()}
+                                )
+
+        if self.__instrumentation is not None:
+            self.__instrumentation.record("type_letter", start)
+            self.__instrumentation.record_after_render(
+                self.__root, "type_letter_render", start
+            )
+
     def __click_add_button(self) -> None:
         """Handles click events on the add word button.
         Calls the game's event_from_gui method with the event type "add_word"
         """
 
+        if self.__instrumentation is not None:
+            start = self.__instrumentation.start()
+
         self.__game.event_from_gui(event_type="add_word", event_data=None)
 
+        if self.__instrumentation is not None:
+            self.__instrumentation.record("add_word", start)
+            self.__instrumentation.record_after_render(
+                self.__root, "add_word_render", start
+            )
+
     def update_current_word(self, string: str) -> None:
         """Updates the current word placeholder with the given string"""
         self.__canvas.itemconfig("current_word", text=f"{string}")
@@ -94,6 +141,12 @@ class GUI:
 
         self.__num_words += 1
 
+    def highlight_path(self, path: list) -> None:
+        """Highlights the tiles of the given path, and only them"""
+        self.clear_board()
+        for y, x in path:
+            self.__canvas.itemconfig(f"tile_{y}_{x}", fill="#92cff0")
+
     def clear_board(self) -> None:
         """Clears the board"""
         for tile in self.__tiles:
@@ -101,6 +154,8 @@ class GUI:
 
     def __update_clock(self) -> None:
         """Updates the clock"""
+        if self.__instrumentation is not None:
+            self.__instrumentation.clock_tick(1000)
         new_time = time() - self.__start_time
         if new_time > self.__end_time:
             self.__root.destroy()
@@ -108,6 +163,15 @@ class GUI:
         self.__canvas.itemconfig("time", text=f"Time: {round(new_time)}")
         self.__root.after(1000, self.__update_clock)
         
+    def schedule(self, delay_ms: int, callback) -> None:
+        """Calls callback on the mainloop of the game after delay_ms
+        milliseconds. Nothing is called once the game window is closed."""
+        self.__root.after(delay_ms, callback)
+
+    def update_best_score(self, text: str) -> None:
+        """Updates the best possible score placeholder"""
+        self.__canvas.itemconfig("best_score", text=text)
+
     def update_score(self, score: int) -> None:
         """Updates the score
         :param score: The new score
@@ -192,6 +256,8 @@ class GUI:
         self.__canvas.create_text(200, 70, text="", font=("Arial", 19, "bold"), tags="current_word")
         self.__add_button = Button(self.__root, text="Add word", font=("Arial", 10, "bold"), height=2, command=self.__click_add_button)
         self.__add_button.place(x=20, y=50)
+        # Words can also be typed, their path is found on the board
+        self.__root.bind("<Key>", self.__press_key)
 
         # Create a block for the words
         self.__canvas.create_rectangle(20, 100, 305, 400, fill="white", outline="black", tags="words_block")
@@ -202,8 +268,12 @@ class GUI:
         self.__end_time = self.END_TIME
         self.__canvas.create_text(50, 10, text="Time: 0", font=("Arial", 10), tags="time")
         self.__canvas.create_text(200, 10, text="Score: 0", font=("Arial", 10), tags="score")
+        self.__canvas.create_text(350, 10, text="", font=("Arial", 10), tags="best_score")
 
+        if self.__instrumentation is not None:
+            self.__instrumentation.watch(self.__root)
         self.__update_clock()
+        self.__game.event_from_gui(event_type="game_started", event_data=None)
         self.__root.mainloop()
     
 if __name__ == "__main__":
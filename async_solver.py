@@ -0,0 +1,144 @@
+"""
+Background solves for the Tk GUI.
+
+The solver runs in a worker thread and never touches Tk. Its progress and
+result are put in a queue, which the mainloop drains with short after
+callbacks, so the UI thread only ever spends the time of a queue read.
+While a solve runs, the UI thread waits at most one interpreter switch
+interval (sys.getswitchinterval, 5 ms by default) for the worker to give up
+the GIL.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import Empty, SimpleQueue
+from typing import Callable, Iterable, List, Optional
+
+from ex11_utils import Board, Path, anytime_max_score_paths
+
+# Calls a callback after a delay in milliseconds on the UI thread, like
+# Tk.after.
+Scheduler = Callable[[int, Callable[[], None]], object]
+DoneCallback = Callable[[List[Path], bool], None]
+ProgressCallback = Callable[[int, int], None]
+
+POLL_INTERVAL_MS = 50
+
+
+class SolveHandle:
+    """
+    A solve started by BackgroundSolver.
+    Cancelling it stops the worker at its next check and drops the progress
+    and result that were not delivered yet.
+    """
+
+    def __init__(self, future: Future, cancelled: threading.Event):
+        self.__future = future
+        self.__cancelled = cancelled
+
+    @property
+    def future(self) -> Future:
+        """The future of the (paths, complete) result of the solve."""
+        return self.__future
+
+    def cancel(self) -> None:
+        """Cancels the solve. Its callbacks are not called anymore."""
+        self.__cancelled.set()
+        self.__future.cancel()
+
+    def cancelled(self) -> bool:
+        return self.__cancelled.is_set()
+
+    def done(self) -> bool:
+        return self.__future.done()
+
+
+class BackgroundSolver:
+    """
+    Runs max score solves in a worker thread and delivers their progress and
+    result on the UI thread.
+    """
+
+    def __init__(self, max_workers: int = 1):
+        """:param max_workers: number of solves that can run at once."""
+        self.__executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix="boggle-solver"
+        )
+        self.__handles: List[SolveHandle] = []
+
+    def solve(
+        self,
+        board: Board,
+        words: Iterable[str],
+        schedule: Scheduler,
+        on_done: DoneCallback,
+        on_progress: Optional[ProgressCallback] = None,
+        deadline_ms: Optional[float] = None,
+        poll_ms: int = POLL_INTERVAL_MS,
+    ) -> SolveHandle:
+        """
+        Starts finding the longest path of every word of a board.
+        :param board: two dimensional list of strings representing the board.
+        :param words: the words, preferably a Lexicon so it is not built in
+            the worker.
+        :param schedule: schedules a callback on the UI thread, like
+            Tk.after of the window of the game.
+        :param on_done: called on the UI thread with the paths and whether
+            the solve finished, as anytime_max_score_paths returns them.
+        :param on_progress: called on the UI thread with the number of
+            starting tiles searched and their total.
+        :param deadline_ms: time budget of the solve, None for no limit.
+        :param poll_ms: interval of the checks of the UI thread.
+        :return: the handle of the solve.
+        """
+        cancelled = threading.Event()
+        messages: SimpleQueue = SimpleQueue()
+
+        def progress(searched: int, total: int) -> None:
+            messages.put((searched, total))
+
+        future = self.__executor.submit(
+            anytime_max_score_paths,
+            board,
+            words,
+            deadline_ms,
+            cancelled.is_set,
+            progress if on_progress is not None else None,
+        )
+        handle = SolveHandle(future, cancelled)
+        self.__handles = [h for h in self.__handles if not h.done()]
+        self.__handles.append(handle)
+
+        def poll() -> None:
+            if cancelled.is_set():
+                return
+            # Checked first, so the last progress is drawn before the result.
+            finished = future.done()
+            if on_progress is not None:
+                # Only the latest progress is worth drawing.
+                latest = None
+                try:
+                    while True:
+                        latest = messages.get_nowait()
+                except Empty:
+                    pass
+                if latest is not None:
+                    on_progress(*latest)
+            if not finished:
+                schedule(poll_ms, poll)
+                return
+            # A failed solve raises here, where Tk reports it.
+            on_done(*future.result())
+
+        schedule(poll_ms, poll)
+        return handle
+
+    def cancel_all(self) -> None:
+        """Cancels every solve that is still running."""
+        for handle in self.__handles:
+            handle.cancel()
+        self.__handles = []
+
+    def shutdown(self) -> None:
+        """Cancels the running solves and stops the worker threads."""
+        self.cancel_all()
+        self.__executor.shutdown(wait=False)
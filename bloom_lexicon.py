@@ -0,0 +1,468 @@
+import argparse
+import mmap
+import struct
+import tracemalloc
+from array import array
+from bisect import bisect_left
+from math import ceil, log
+from time import perf_counter
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from board_encoding import Alphabet
+from lexicon import FREE, ROOT, find_base
+
+WORDS_MAGIC = b"BGWRD\x01"
+FILTER_MAGIC = b"BGBLM\x01"
+COUNT = struct.Struct("<I")
+
+# 64 bit FNV-1a, updated one letter code at a time.
+FNV_OFFSET = 0xCBF29CE484222325
+FNV_PRIME = 0x100000001B3
+MASK_64 = 0xFFFFFFFFFFFFFFFF
+# Mixed into a prefix hash to get the hash of the word itself.
+WORD_SALT = 0x9E3779B97F4A7C15
+
+# Once the expanded part of the trie holds more nodes than this, it is
+# dropped before the next solve so memory stays bounded. A solve expands a
+# few hundred nodes, and every node costs about 30 bytes of the arrays.
+DEFAULT_MAX_NODES = 8192
+
+# Base of the nodes whose children are not created yet.
+UNEXPANDED = -1
+
+
+def extend_hash(state: int, code: int) -> int:
+    """Returns the hash of a partial word extended by a letter code."""
+    return ((state ^ (code + 1)) * FNV_PRIME) & MASK_64
+
+
+def word_hash(state: int) -> int:
+    """Returns the hash of a whole word from the hash of its letters."""
+    return ((state ^ WORD_SALT) * FNV_PRIME) & MASK_64
+
+
+class BloomFilter:
+    """A Bloom filter of 64 bit hashes, using double hashing."""
+
+    def __init__(self, size: int, hashes: int, bits: Optional[bytes] = None):
+        """Creates an empty filter, or one holding the given bits.
+        :param size: number of bits.
+        :param hashes: number of bits set for every item.
+        :param bits: the bits of a saved filter."""
+        self.size = max(size, 8)
+        self.hashes = max(hashes, 1)
+        self.bits = bytearray(bits) if bits is not None \
+            else bytearray((self.size + 7) // 8)
+
+    @classmethod
+    def for_capacity(
+        cls, items: int, false_positive_rate: float
+    ) -> "BloomFilter":
+        """Creates a filter sized for a number of items and error rate."""
+        items = max(items, 1)
+        size = ceil(-items * log(false_positive_rate) / log(2) ** 2)
+        return cls(size, round(size / items * log(2)))
+
+    def __positions(self, item: int) -> Iterator[int]:
+        first, step = item & 0xFFFFFFFF, (item >> 32) | 1
+        for i in range(self.hashes):
+            yield (first + i * step) % self.size
+
+    def add(self, item: int) -> None:
+        """Adds a hash to the filter."""
+        for position in self.__positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: int) -> bool:
+        # The positions of __positions, inlined: lookups are most of the
+        # cost of expanding a node.
+        bits = self.bits
+        size = self.size
+        first, step = item & 0xFFFFFFFF, (item >> 32) | 1
+        for _ in range(self.hashes):
+            position = first % size
+            if not bits[position >> 3] >> (position & 7) & 1:
+                return False
+            first += step
+        return True
+
+
+class SortedWordFile:
+    """
+    The words of a lexicon as a sorted array in a memory mapped file.
+    The file holds the number of words, the offset of every word and then
+    the words, so a lookup is a binary search that only reads the pages of
+    the words it compares to.
+    """
+
+    def __init__(self, path: str):
+        """Maps a file written by SortedWordFile.write."""
+        with open(path, "rb") as f:
+            self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.__map[:len(WORDS_MAGIC)] != WORDS_MAGIC:
+            raise ValueError(f"{path} is not a sorted word file")
+        self.__count = COUNT.unpack_from(self.__map, len(WORDS_MAGIC))[0]
+        self.__offsets = len(WORDS_MAGIC) + COUNT.size
+        self.__data = self.__offsets + 4 * (self.__count + 1)
+
+    @staticmethod
+    def write(words: Iterable[str], path: str) -> int:
+        """Writes the sorted, distinct words to a file.
+        :return: the number of words written."""
+        encoded = sorted({word.encode("utf-8") for word in words})
+        offsets = array("I", [0])
+        for word in encoded:
+            offsets.append(offsets[-1] + len(word))
+        with open(path, "wb") as f:
+            f.write(WORDS_MAGIC)
+            f.write(COUNT.pack(len(encoded)))
+            f.write(offsets.tobytes())
+            for word in encoded:
+                f.write(word)
+        return len(encoded)
+
+    def __offset(self, i: int) -> int:
+        return COUNT.unpack_from(self.__map, self.__offsets + 4 * i)[0]
+
+    def __getitem__(self, i: int) -> bytes:
+        start = self.__data + self.__offset(i)
+        return self.__map[start:self.__data + self.__offset(i + 1)]
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def __contains__(self, word: str) -> bool:
+        encoded = word.encode("utf-8")
+        i = bisect_left(self, encoded)
+        return i < self.__count and self[i] == encoded
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self.__count):
+            yield self[i].decode("utf-8")
+
+    def close(self) -> None:
+        self.__map.close()
+
+
+class _LazyBases(array):
+    """The bases of the trie nodes, whose children are created when the
+    base is first looked at."""
+
+    def __new__(cls, lexicon: "BloomLexicon") -> "_LazyBases":
+        bases = super().__new__(cls, "i", [UNEXPANDED])
+        bases.__lexicon = lexicon
+        return bases
+
+    def __getitem__(self, node: int) -> int:
+        first = array.__getitem__(self, node)
+        if first == UNEXPANDED:
+            first = self.__lexicon._expand(node)
+        return first
+
+
+class BloomLexicon:
+    """
+    A lexicon for memory constrained hosts.
+    Partial words are pruned with a Bloom filter and words are confirmed
+    exactly against a sorted word file on disk. It offers the same tables
+    as Lexicon, whose nodes are created while the solvers walk them, so it
+    can be passed as the words of the ex11_utils functions. A false positive
+    only costs exploring a partial word that leads nowhere, the words found
+    are always exact. It can't be changed once built.
+    """
+
+    # Partial word counts are not known, only whether they may be live.
+    exact = False
+
+    def __init__(
+        self,
+        prefix_filter: BloomFilter,
+        word_filter: BloomFilter,
+        words: SortedWordFile,
+        letters: List[str],
+        max_word_length: int,
+        max_nodes: int = DEFAULT_MAX_NODES,
+    ):
+        """Creates a lexicon from its parts, see build and load."""
+        self.__prefix_filter = prefix_filter
+        self.__word_filter = word_filter
+        self.__words = words
+        self.__alphabet = Alphabet()
+        for letter in letters:
+            self.__alphabet.add_letter(letter)
+        self.__max_word_length = max_word_length
+        self.__max_nodes = max_nodes
+        self.__reset_nodes()
+
+    @classmethod
+    def build(
+        cls,
+        words: Iterable[str],
+        path: str,
+        false_positive_rate: float = 0.01,
+        max_nodes: int = DEFAULT_MAX_NODES,
+    ) -> "BloomLexicon":
+        """
+        Builds the filters and the sorted word file of a list of words.
+        Writes path + ".words" and path + ".bloom".
+        :param words: the words of the lexicon.
+        :param path: path prefix of the files.
+        :param false_positive_rate: the rate of partial words that are
+            explored while no word starts with them. Lower rates cost more
+            memory, about 1.2 bytes per partial word at 1%.
+        :param max_nodes: see DEFAULT_MAX_NODES.
+        :return: the lexicon.
+        """
+        words = set(words)
+        alphabet = Alphabet()
+        prefixes = set()
+        for word in words:
+            state = FNV_OFFSET
+            for letter in word:
+                state = extend_hash(state, alphabet.add_letter(letter))
+                prefixes.add(state)
+        prefix_filter = BloomFilter.for_capacity(
+            len(prefixes), false_positive_rate
+        )
+        for state in prefixes:
+            prefix_filter.add(state)
+        del prefixes
+        word_filter = BloomFilter.for_capacity(len(words), false_positive_rate)
+        for word in words:
+            state = FNV_OFFSET
+            for letter in word:
+                state = extend_hash(state, alphabet.letter_code(letter))
+            word_filter.add(word_hash(state))
+
+        SortedWordFile.write(words, path + ".words")
+        letters = [alphabet.letter(code) for code in range(len(alphabet))]
+        max_word_length = max(map(len, words), default=0)
+        with open(path + ".bloom", "wb") as f:
+            f.write(FILTER_MAGIC)
+            f.write(COUNT.pack(max_word_length))
+            encoded_letters = "".join(letters).encode("utf-8")
+            f.write(COUNT.pack(len(encoded_letters)))
+            f.write(encoded_letters)
+            for bloom in (prefix_filter, word_filter):
+                f.write(COUNT.pack(bloom.size))
+                f.write(COUNT.pack(bloom.hashes))
+                f.write(bloom.bits)
+        return cls(
+            prefix_filter,
+            word_filter,
+            SortedWordFile(path + ".words"),
+            letters,
+            max_word_length,
+            max_nodes,
+        )
+
+    @classmethod
+    def load(
+        cls, path: str, max_nodes: int = DEFAULT_MAX_NODES
+    ) -> "BloomLexicon":
+        """Opens the files written by build with the same path prefix."""
+        with open(path + ".bloom", "rb") as f:
+            if f.read(len(FILTER_MAGIC)) != FILTER_MAGIC:
+                raise ValueError(f"{path}.bloom is not a Bloom lexicon")
+            max_word_length = COUNT.unpack(f.read(COUNT.size))[0]
+            letters_size = COUNT.unpack(f.read(COUNT.size))[0]
+            letters = list(f.read(letters_size).decode("utf-8"))
+            filters = []
+            for _ in range(2):
+                size = COUNT.unpack(f.read(COUNT.size))[0]
+                hashes = COUNT.unpack(f.read(COUNT.size))[0]
+                filters.append(
+                    BloomFilter(size, hashes, f.read((max(size, 8) + 7) // 8))
+                )
+        return cls(
+            filters[0],
+            filters[1],
+            SortedWordFile(path + ".words"),
+            letters,
+            max_word_length,
+            max_nodes,
+        )
+
+    def __reset_nodes(self) -> None:
+        """Drops the expanded nodes, keeping only the root."""
+        self.__base = _LazyBases(self)
+        self.__check = array("i", [FREE])
+        self.__states = array("Q", [FNV_OFFSET])
+        self.__depths = array("H", [0])
+        self.__live = bytearray(b"\x01")
+        self.__terminal = bytearray(1)
+        # No position before this one is free.
+        self.__free = 1
+        self.__nodes = 1
+
+    def _expand(self, node: int) -> int:
+        """Creates the children of a node that may start a word.
+        :return: the base of the node."""
+        depth = self.__depths[node]
+        state = self.__states[node]
+        codes = [
+            code
+            for code in range(len(self.__alphabet))
+            if depth < self.__max_word_length
+            and extend_hash(state, code) in self.__prefix_filter
+        ]
+        if not codes:
+            array.__setitem__(self.__base, node, 0)
+            return 0
+        check = self.__check
+        first = find_base(check, codes, self.__free)
+        missing = first + len(self.__alphabet) - len(check)
+        if missing > 0:
+            self.__base.extend(array("i", [0]) * missing)
+            check.extend(array("i", [FREE]) * missing)
+            self.__states.extend(array("Q", [0]) * missing)
+            self.__depths.extend(array("H", [0]) * missing)
+            self.__live.extend(bytes(missing))
+            self.__terminal.extend(bytes(missing))
+        # Set before the words of the children are spelled by word_at.
+        array.__setitem__(self.__base, node, first)
+        for code in codes:
+            child = first + code
+            child_state = extend_hash(state, code)
+            array.__setitem__(self.__base, child, UNEXPANDED)
+            check[child] = node
+            self.__states[child] = child_state
+            self.__depths[child] = depth + 1
+            self.__live[child] = 1
+            self.__terminal[child] = (
+                word_hash(child_state) in self.__word_filter
+                and self.word_at(child) in self.__words
+            )
+        self.__nodes += len(codes)
+        try:
+            self.__free = check.index(FREE, self.__free)
+        except ValueError:
+            self.__free = len(check)
+        return first
+
+    def tables(self) -> Tuple[array, array, bytearray, bytearray]:
+        """
+        Returns the tables of the trie, as Lexicon.tables does.
+        The nodes are expanded while the tables are used, and dropped here
+        if there are more than max_nodes of them, so call it once per solve.
+        """
+        if self.__nodes > self.__max_nodes:
+            self.__reset_nodes()
+        return self.__base, self.__check, self.__live, self.__terminal
+
+    def children(self, node: int) -> List[int]:
+        """Returns the child nodes of a node, expanding it if needed."""
+        first = self.__base[node]
+        if not first:
+            return []
+        check = self.__check
+        return [
+            child
+            for child in range(first, first + len(self.__alphabet))
+            if check[child] == node
+        ]
+
+    @property
+    def alphabet(self) -> Alphabet:
+        """The alphabet coding the letters of the trie."""
+        return self.__alphabet
+
+    @property
+    def max_word_length(self) -> int:
+        """The length of the longest word."""
+        return self.__max_word_length
+
+    def depth(self, node: int) -> int:
+        """Returns the number of letters spelled from the root to a node."""
+        return self.__depths[node]
+
+    def word_at(self, node: int) -> str:
+        """Returns the string spelled from the root to a node."""
+        codes = []
+        while node != ROOT:
+            parent = self.__check[node]
+            codes.append(node - self.__base[parent])
+            node = parent
+        return self.__alphabet.decode(tuple(reversed(codes)))
+
+    def memory_bytes(self) -> int:
+        """Returns the size of the filters, the words stay on disk."""
+        return len(self.__prefix_filter.bits) + len(self.__word_filter.bits)
+
+    def __contains__(self, word: object) -> bool:
+        if not isinstance(word, str):
+            return False
+        state = FNV_OFFSET
+        for letter in word:
+            code = self.__alphabet.letter_code(letter)
+            if code < 0:
+                return False
+            state = extend_hash(state, code)
+        return word_hash(state) in self.__word_filter and word in self.__words
+
+    def __len__(self) -> int:
+        return len(self.__words)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__words)
+
+
+def benchmark(dict_path: str, boards: int = 20, seed: int = 0) -> None:
+    """
+    Compares the memory and solve time of the lexicon backends.
+    Prints, for a set of words, a Lexicon and BloomLexicons of a few false
+    positive rates, the memory taken by the loaded backend, the peak memory
+    while running max_score_paths on random boards (both with tracemalloc)
+    and the time per board. The solve time is measured apart, tracemalloc
+    slows the solvers down.
+    """
+    import os
+    import random
+    import tempfile
+
+    from boggle_board_randomizer import randomize_board
+    from ex11_utils import max_score_paths
+    from lexicon import Lexicon
+
+    with open(dict_path, "r") as f:
+        words = f.read().split()
+    random.seed(seed)
+    sample = [randomize_board() for _ in range(boards)]
+
+    def measure(name, build):
+        backend = build()
+        start = perf_counter()
+        found = sum(len(max_score_paths(board, backend)) for board in sample)
+        elapsed = (perf_counter() - start) * 1000 / boards
+        del backend
+        tracemalloc.start()
+        backend = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        for board in sample:
+            max_score_paths(board, backend)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(
+            f"{name:>20}: {size / 2 ** 20:7.1f} MB loaded,"
+            f" {peak / 2 ** 20:7.1f} MB peak solving,"
+            f" {elapsed:7.1f} ms/board, {found} words"
+        )
+
+    with tempfile.TemporaryDirectory() as directory:
+        measure("set", lambda: set(words))
+        measure("Lexicon", lambda: Lexicon(words))
+        for rate in (0.1, 0.01, 0.001):
+            path = os.path.join(directory, str(rate))
+            BloomLexicon.build(words, path, rate)
+            measure(f"BloomLexicon {rate}", lambda: BloomLexicon.load(path))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the Bloom lexicon against the exact ones."
+    )
+    parser.add_argument("--dict", default="boggle_dict.txt")
+    parser.add_argument("--boards", type=int, default=20)
+    args = parser.parse_args()
+    benchmark(args.dict, args.boards)
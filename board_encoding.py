@@ -0,0 +1,208 @@
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Tuple
+
+# Code of letters that no word uses.
+UNKNOWN = -1
+
+# A blank tile matches any single letter.
+BLANK = "?"
+# The letters of a blank tile on an EncodedBoard. Solvers compare a cell's
+# letters with it by identity and follow every child of the trie there.
+WILDCARD = -2
+BLANK_LETTERS = (WILDCARD,)
+
+# legal directions to move in.
+DIRECTIONS = [
+    (0, 1),
+    (1, 0),
+    (0, -1),
+    (-1, 0),
+    (1, 1),
+    (-1, -1),
+    (1, -1),
+    (-1, 1),
+]
+
+
+class Alphabet:
+    """
+    Maps letters and tiles to small integer codes.
+    Letters get consecutive codes from 0 in the order they are first seen.
+    A tile, which may hold several letters like "QU", gets its own code and
+    is spelled by the codes of its letters.
+    """
+
+    def __init__(self):
+        self.__letter_codes: Dict[str, int] = {}
+        self.__letters: List[str] = []
+        self.__tile_codes: Dict[str, int] = {}
+        self.__tile_letters: List[Tuple[int, ...]] = []
+
+    def add_letter(self, letter: str) -> int:
+        """Returns the code of a letter, giving it a new code if needed."""
+        code = self.__letter_codes.get(letter)
+        if code is None:
+            code = len(self.__letters)
+            self.__letter_codes[letter] = code
+            self.__letters.append(letter)
+        return code
+
+    def letter_code(self, letter: str) -> int:
+        """Returns the code of a letter, UNKNOWN if it was never added."""
+        return self.__letter_codes.get(letter, UNKNOWN)
+
+    def letter(self, code: int) -> str:
+        """Returns the letter of a code."""
+        return self.__letters[code]
+
+    def encode(self, string: str) -> Tuple[int, ...]:
+        """Returns the codes of the letters of a string."""
+        return tuple(self.letter_code(letter) for letter in string)
+
+    def decode(self, codes: Tuple[int, ...]) -> str:
+        """Returns the string spelled by letter codes."""
+        return "".join(self.__letters[code] for code in codes)
+
+    def tile_code(self, tile: str) -> int:
+        """Returns the code of a tile, giving it a new code if needed.
+        Tile codes are stable, the letters spelling them are looked up
+        again with tile_letters since new letters may be added later."""
+        code = self.__tile_codes.get(tile)
+        if code is None:
+            code = len(self.__tile_letters)
+            self.__tile_codes[tile] = code
+            self.__tile_letters.append(())
+        return code
+
+    def tile_letters(self, code: int, tile: str) -> Tuple[int, ...]:
+        """Returns the letter codes spelling a tile."""
+        letters = self.__tile_letters[code]
+        if len(letters) != len(tile) or UNKNOWN in letters:
+            letters = self.encode(tile)
+            self.__tile_letters[code] = letters
+        return letters
+
+    def __len__(self) -> int:
+        return len(self.__letters)
+
+
+@lru_cache(maxsize=None)
+def neighbours(rows: int, cols: int) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Returns the adjacent cells of every cell of a board shape.
+    Cells are numbered row by row, cell x * cols + y is tile (x, y).
+    :param rows: number of rows of the board.
+    :param cols: number of columns of the board.
+    :return: tuple holding the tuple of neighbours of every cell.
+    """
+    result = []
+    for x in range(rows):
+        for y in range(cols):
+            result.append(
+                tuple(
+                    (x + dx) * cols + y + dy
+                    for dx, dy in DIRECTIONS
+                    if 0 <= x + dx < rows and 0 <= y + dy < cols
+                )
+            )
+    return tuple(result)
+
+
+@lru_cache(maxsize=None)
+def neighbour_masks(rows: int, cols: int) -> Tuple[int, ...]:
+    """
+    Returns the adjacency matrix of a board shape as one bitmask per cell.
+    Bit j of the mask of cell i is set if cell j is adjacent to cell i.
+    :param rows: number of rows of the board.
+    :param cols: number of columns of the board.
+    :return: tuple holding the neighbours bitmask of every cell.
+    """
+    return tuple(
+        sum(1 << cell for cell in cells) for cells in neighbours(rows, cols)
+    )
+
+
+@lru_cache(maxsize=None)
+def neighbour_moves(
+    rows: int, cols: int
+) -> Tuple[Tuple[Tuple[int, int], ...], ...]:
+    """
+    Returns the moves from every cell of a board shape as pairs of an
+    adjacent cell and its bit, so a search keeping its visited cells as a
+    bitmask tests a move with a single AND.
+    :param rows: number of rows of the board.
+    :param cols: number of columns of the board.
+    :return: tuple holding the tuple of (cell, 1 << cell) moves of every
+        cell.
+    """
+    return tuple(
+        tuple((cell, 1 << cell) for cell in cells)
+        for cells in neighbours(rows, cols)
+    )
+
+
+@lru_cache(maxsize=None)
+def adjacent_pairs(rows: int, cols: int) -> FrozenSet[Tuple[int, int]]:
+    """
+    Returns the pairs of adjacent cells of a board shape, so the moves of a
+    path of cells are all checked at once with zip and a set lookup.
+    :param rows: number of rows of the board.
+    :param cols: number of columns of the board.
+    :return: frozenset of (cell, adjacent cell) pairs, both orders given.
+    """
+    return frozenset(
+        (cell, adjacent)
+        for cell, cells in enumerate(neighbours(rows, cols))
+        for adjacent in cells
+    )
+
+
+class EncodedBoard:
+    """
+    A board as flat arrays of integers.
+    tiles holds the tile code of every cell, letters the letter codes
+    spelling it (BLANK_LETTERS for a blank tile) and neighbours the cells
+    adjacent to it.
+    """
+
+    def __init__(self, board: List[List[str]], alphabet: Alphabet):
+        """Encodes a board with the codes of an alphabet.
+        :param board: two dimensional list of strings representing the board.
+        :param alphabet: the alphabet of the lexicon the board is solved
+            with. Tiles are added to it, letters are not."""
+        self.rows = len(board)
+        self.cols = len(board[0]) if board else 0
+        self.tiles: List[int] = []
+        self.letters: List[Tuple[int, ...]] = []
+        self.__alphabet = alphabet
+        for row in board:
+            for tile in row:
+                self.tiles.append(UNKNOWN)
+                self.letters.append(())
+                self.set_tile(len(self.tiles) - 1, tile)
+        self.neighbours = neighbours(self.rows, self.cols)
+
+    def set_tile(self, cell: int, tile: str) -> None:
+        """Changes the tile of a cell."""
+        code = self.__alphabet.tile_code(tile)
+        self.tiles[cell] = code
+        if tile == BLANK:
+            self.letters[cell] = BLANK_LETTERS
+        else:
+            self.letters[cell] = self.__alphabet.tile_letters(code, tile)
+
+    def __len__(self) -> int:
+        return len(self.tiles)
+
+    def cell(self, x: int, y: int) -> int:
+        """Returns the cell index of tile (x, y)."""
+        return x * self.cols + y
+
+    def tile(self, cell: int) -> Tuple[int, int]:
+        """Returns the (x, y) tile of a cell index."""
+        return divmod(cell, self.cols)
+
+    def path(self, cells: List[int]) -> List[Tuple[int, int]]:
+        """Returns the path of tuples visiting the given cells."""
+        cols = self.cols
+        return [divmod(cell, cols) for cell in cells]
@@ -1,6 +1,17 @@
 from boggle_board_randomizer import randomize_board
 from GUI import GUI
-from ex11_utils import is_valid_path, is_valid_partial_path
+from ex11_utils import (
+    find_word_path,
+    is_valid_path,
+    is_valid_partial_path,
+    letter_positions,
+    word_score,
+)
+from lexicon import Lexicon
+from event_log import EventLogWriter
+from gui_instrumentation import GuiInstrumentation
+from async_solver import BackgroundSolver
+from typing import Iterable, Optional
 
 class Boggle:
     """
@@ -9,21 +20,57 @@ class Boggle:
     and for comunication between the logic and GUI.
     """
 
-    def __init__(self, valid_words: list[str]):
+    def __init__(
+        self,
+        valid_words: Iterable[str],
+        event_log: Optional[str] = None,
+        latency_log: Optional[str] = None,
+        show_best_score: bool = False,
+    ):
+        """
+        :param valid_words: The words that are accepted in the game
+        :param event_log: If given, the events of every game are appended
+        to the binary log at this path, see replay_validator.py
+        :param latency_log: If given, the GUI latencies of every game are
+        appended to this file, see gui_instrumentation.py
+        :param show_best_score: If True, the best possible score of every
+        board is found in the background while it is played and shown
+        """
 
-        self.__valid_words = valid_words        
+        # A Lexicon can be changed between rounds (banned or custom words)
+        # without being built again.
+        if not isinstance(valid_words, Lexicon):
+            valid_words = Lexicon(valid_words)
+        self.__valid_words = valid_words
         self.__keep_playing = True
+        self.__event_log = None if event_log is None \
+            else EventLogWriter(event_log)
+        self.__instrumentation = None if latency_log is None \
+            else GuiInstrumentation(latency_log)
         self.__menu_screen_text = "Welcome to Boggle!\nDo you want to play a game?"
+        # Finds the best possible score of the board while the game is played.
+        self.__solver = BackgroundSolver() if show_best_score else None
+        self.__solve = None
 
     def __setup_game(self) -> None:
         """
         Sets up the board.
         """
+        # The solve of the previous board is not needed anymore
+        if self.__solve is not None:
+            self.__solve.cancel()
+            self.__solve = None
+
         # Create the board
         self.__board = randomize_board()
+        # Where typed words are looked for.
+        self.__positions = letter_positions(self.__board)
 
         # Create the GUI object
-        self.__gui = GUI(self, self.__board)
+        self.__gui = GUI(self, self.__board, self.__instrumentation)
+
+        if self.__event_log is not None:
+            self.__event_log.new_game(self.__board)
         
         # Sets the game to a neutral state
         self.__words = []
@@ -32,6 +79,14 @@ class Boggle:
         self.__current_word = ""
         self.__current_path = []
 
+    @property
+    def lexicon(self) -> Lexicon:
+        """
+        The words that are accepted in the game.
+        Words added to or removed from it apply from the next submission.
+        """
+        return self.__valid_words
+
     def event_from_gui(self, event_type: str, event_data: dict) -> bool:
         """
         Handles events from the GUI.
@@ -42,8 +97,13 @@ class Boggle:
         note: 
         For click_tile event, event_data should be a dict with keys "x" and "y"
         representing the coordinates of the tile
-        For add_word event, event_data should be None
+        For type_letter event, event_data should be a dict with key "letter"
+        For add_word, erase_letter and game_started events, event_data
+        should be None
         """
+        if self.__event_log is not None:
+            self.__event_log.record(event_type, event_data)
+
         if event_type == "quit_game":
             self.__keep_playing = False
             return True
@@ -64,12 +124,95 @@ class Boggle:
             
             return True
 
+        if event_type == "type_letter":
+            return self.__type_letter(event_data["letter"])
+
+        if event_type == "erase_letter":
+            return self.__erase_letter()
+
         if event_type == "add_word":
             self.__add_word(self.__current_word)
             return True
+
+        if event_type == "game_started":
+            if self.__solver is not None:
+                self.__start_solve()
+            return True
         
         return False
 
+    def __start_solve(self) -> None:
+        """
+        Starts finding the best possible score of the board in the background
+        """
+        gui = self.__gui
+        board = self.__board
+        gui.update_best_score("Best: ...")
+
+        def on_progress(searched: int, total: int) -> None:
+            gui.update_best_score(f"Best: ... {100 * searched // total}%")
+
+        def on_done(paths: list, complete: bool) -> None:
+            # Scored like submitted words, by their letters and not their
+            # tiles.
+            best = sum(
+                word_score("".join(board[y][x] for y, x in path))
+                for path in paths
+            )
+            gui.update_best_score(f"Best: {best}")
+
+        self.__solve = self.__solver.solve(
+            board, self.__valid_words, gui.schedule, on_done, on_progress
+        )
+
+    def __type_letter(self, letter: str) -> bool:
+        """
+        Adds a typed letter to the current word and finds its path
+        :param letter: The typed letter
+        :return: True if the new word can be formed on the board
+        """
+        # A letter starting a tile of several letters, like the Q of QU,
+        # types the whole tile.
+        words = [self.__current_word + letter] + [
+            self.__current_word + tile
+            for row in self.__board
+            for tile in row
+            if len(tile) > 1 and tile.startswith(letter)
+        ]
+        for word in words:
+            path = find_word_path(self.__board, word, self.__positions)
+            if path is not None:
+                self.__set_typed_path(word, path)
+                return True
+        return False
+
+    def __erase_letter(self) -> bool:
+        """
+        Removes the last tile of the current word
+        :return: False if the current word is already empty
+        """
+        if not self.__current_path:
+            return False
+        y, x = self.__current_path[-1]
+        word = self.__current_word[:-len(self.__board[y][x])]
+        path = find_word_path(self.__board, word, self.__positions) or []
+        self.__set_typed_path(word, path)
+        return True
+
+    def __set_typed_path(self, word: str, path: list) -> None:
+        """
+        Makes a typed word the current word
+        :param word: The typed word
+        :param path: The path forming it
+        """
+        self.__current_path = path
+        if self.__event_log is not None:
+            # The log knows paths, not letters, so a typed word is logged
+            # as the path it forms.
+            self.__event_log.record("set_path", {"path": path})
+        self.__update_current_word(word)
+        self.__gui.highlight_path(path)
+
     def __update_current_word(self, string: str) -> None:
         """
         Updates the current word
@@ -92,7 +235,7 @@ class Boggle:
             self.__words.append(word)
             self.__gui.add_word(self.__current_word)
             # Update the score
-            self.__score += len(self.__current_word) ** 2
+            self.__score += word_score(self.__current_word)
             self.__gui.update_score(self.__score)
 
         # Clear the current word
@@ -105,6 +248,13 @@ class Boggle:
             self.__setup_game()
             self.__gui.start_game(self.__menu_screen_text)
             self.__menu_screen_text = "Do you want to play again?"
+            if self.__instrumentation is not None:
+                self.__instrumentation.dump()
+
+        if self.__solver is not None:
+            self.__solver.shutdown()
+        if self.__event_log is not None:
+            self.__event_log.close()
         
 
 
@@ -5,7 +5,9 @@
 # DESCRIPTION:A helper file for ex11 that randomizes a Boggle board
 ##############################################################################
 import random
-from typing import List
+from typing import List, Optional
+
+from board_encoding import BLANK
 
 
 BOARD_SIZE = 4
@@ -29,21 +31,40 @@ LETTERS = [
 ]
 
 
-def randomize_board(dice_list: List[List[str]] = LETTERS) -> List[List[str]]:
+def with_blank_dice(
+    blanks: int, dice_list: List[List[str]] = LETTERS
+) -> List[List[str]]:
+    """
+    Returns a dice set where some dice are blank on every face.
+    A blank tile matches any letter.
+    :param blanks: the number of dice made blank.
+    :param dice_list: the dice set to start from, it is not changed.
+    :return: the dice set with its first blanks dice made blank.
+    """
+    return [[BLANK] * len(die) for die in dice_list[:blanks]] + \
+        [list(die) for die in dice_list[blanks:]]
+
+
+def randomize_board(
+    dice_list: List[List[str]] = LETTERS, rng: Optional[random.Random] = None
+) -> List[List[str]]:
     """
     Creates a random Boggle board.
     :param dice_list: 2-dimensional list of letters to generate the board from.
+    :param rng: the random generator, the random module by default.
     :return: a 2D list of strings representing a random Boggle board.
     """
+    if rng is None:
+        rng = random
     dice_indices = list(range(len(dice_list)))
-    random.shuffle(dice_indices)
+    rng.shuffle(dice_indices)
     dice_indices_iter = iter(dice_indices)
     board = []
     for i in range(BOARD_SIZE):
         row = []
         for j in range(BOARD_SIZE):
             die = dice_list[next(dice_indices_iter)]
-            letter = random.choice(die)
+            letter = rng.choice(die)
             row.append(letter)
         board.append(row)
     return board
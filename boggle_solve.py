@@ -0,0 +1,156 @@
+"""
+Headless Boggle solver.
+
+Reads boards from stdin, one JSON list of rows per line, and writes one JSON
+line per board with its words, paths and scores:
+
+    echo '[["C","A","T"],["D","O","G"],["B","I","T"]]' | python -m boggle_solve
+
+Only the solver is imported (no tkinter), and the dictionary is loaded from
+a prebuilt index the first time a board arrives, so the process is ready to
+read input right away.
+"""
+from time import perf_counter
+
+_START_TIME = perf_counter()
+
+import argparse
+import json
+import os
+import sys
+from typing import Optional, TextIO
+
+from ex11_utils import (
+    ALL_PATHS,
+    ONE_PATH_PER_WORD,
+    WORDS_ONLY,
+    max_score_paths,
+    max_score_words,
+    word_score,
+)
+from lexicon import Lexicon
+
+DEFAULT_DICT = "boggle_dict.txt"
+INDEX_SUFFIX = ".idx"
+
+
+def load_lexicon(dict_path: str, index_path: Optional[str] = None) -> Lexicon:
+    """
+    Loads the words of a dictionary file from its prebuilt index.
+    The index is built and saved next to the dictionary if it is missing,
+    older than the dictionary or written by another version.
+    :param dict_path: path of the dictionary file, one word per line.
+    :param index_path: path of the index, dict_path + ".idx" by default.
+    :return: the lexicon.
+    """
+    if index_path is None:
+        index_path = dict_path + INDEX_SUFFIX
+    if os.path.exists(index_path) and (
+        not os.path.exists(dict_path)
+        or os.path.getmtime(index_path) >= os.path.getmtime(dict_path)
+    ):
+        try:
+            return Lexicon.load(index_path)
+        except ValueError:
+            pass
+    with open(dict_path, "r") as f:
+        lexicon = Lexicon(f.read().split())
+    try:
+        lexicon.save(index_path)
+    except OSError:
+        # A read only location only costs building the trie next time.
+        pass
+    return lexicon
+
+
+def solve_stream(
+    lines: TextIO,
+    output: TextIO,
+    dict_path: str = DEFAULT_DICT,
+    index_path: Optional[str] = None,
+    mode: str = ONE_PATH_PER_WORD,
+) -> int:
+    """
+    Solves every board read from lines and writes the results to output.
+    Every output line holds the board, its words with their path and score
+    (only the words in WORDS_ONLY mode) and the total score.
+    :param lines: JSON lines of boards, blank lines are skipped.
+    :param output: where the JSON lines of results are written.
+    :param dict_path: path of the dictionary file.
+    :param index_path: path of its prebuilt index.
+    :param mode: the max_score_paths mode.
+    :return: the number of boards solved.
+    """
+    lexicon = None
+    solved = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        board = json.loads(line)
+        if lexicon is None:
+            lexicon = load_lexicon(dict_path, index_path)
+        if mode == WORDS_ONLY:
+            words = max_score_paths(board, lexicon, mode=mode)
+            record = {"board": board, "words": words}
+        else:
+            found = [
+                {"word": word, "path": path, "score": word_score(word)}
+                for word, path in max_score_words(board, lexicon, mode=mode)
+            ]
+            record = {
+                "board": board,
+                "words": found,
+                "score": sum(word["score"] for word in found),
+            }
+        output.write(json.dumps(record, separators=(",", ":")) + "\n")
+        output.flush()
+        solved += 1
+    return solved
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="boggle_solve",
+        description="Solve Boggle boards read as JSON lines from stdin.",
+    )
+    parser.add_argument("--dict", default=DEFAULT_DICT)
+    parser.add_argument(
+        "--index", help="prebuilt index, <dict>.idx by default"
+    )
+    parser.add_argument(
+        "--mode",
+        choices=(ALL_PATHS, ONE_PATH_PER_WORD, WORDS_ONLY),
+        default=ONE_PATH_PER_WORD,
+    )
+    parser.add_argument(
+        "--build-index",
+        action="store_true",
+        help="build the index and exit without reading stdin",
+    )
+    parser.add_argument(
+        "--timing",
+        action="store_true",
+        help="report the startup time and total time to stderr",
+    )
+    args = parser.parse_args(argv)
+
+    if args.build_index:
+        # Imported here, solving boards doesn't need it.
+        from index_builder import build_index
+
+        build_index(args.dict, args.index or args.dict + INDEX_SUFFIX)
+        return
+
+    if args.timing:
+        startup_ms = (perf_counter() - _START_TIME) * 1000
+        print(f"startup: {startup_ms:.1f} ms", file=sys.stderr)
+    solved = solve_stream(
+        sys.stdin, sys.stdout, args.dict, args.index, args.mode
+    )
+    if args.timing:
+        total_ms = (perf_counter() - _START_TIME) * 1000
+        print(f"solved {solved} boards in {total_ms:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+Monte Carlo analytics of dice sets.
+
+Samples random boards of a dice set, solves them and reports how rich they
+are: the distributions of their word counts and best scores, the share of
+dead boards, without any word, and how many words go through every face:
+
+    python dice_analytics.py --boards 100000 --processes 4
+    python dice_analytics.py --dice my_dice.json --scaling 8
+
+Boards are sampled and solved in batches, every batch with its own seed, so
+the results only depend on --seed and not on the number of processes.
+"""
+import argparse
+import json
+import math
+import random
+from collections import Counter
+from multiprocessing import Pool
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+from batch_solver import batch_max_score_paths
+from boggle_board_randomizer import LETTERS, randomize_board
+from ex11_utils import Board, Path, word_score
+from lexicon import Lexicon
+
+BATCH_BOARDS = 256
+# z of the 95% confidence intervals.
+Z_95 = 1.96
+
+
+class DiceStats:
+    """
+    The statistics of the boards sampled from a dice set.
+    Distributions are kept as histograms, so the statistics of batches
+    solved apart can be merged.
+    """
+
+    def __init__(self):
+        self.boards = 0
+        self.dead_boards = 0
+        # number of boards by their number of words and by their score.
+        self.word_counts: Counter = Counter()
+        self.scores: Counter = Counter()
+        # number of times every face was on a board, and of words whose
+        # path went through it.
+        self.faces_seen: Counter = Counter()
+        self.face_words: Counter = Counter()
+
+    def add_board(self, board: Board, paths: List[Path]) -> None:
+        """Adds a board solved by max_score_paths."""
+        self.boards += 1
+        self.word_counts[len(paths)] += 1
+        score = sum(
+            word_score("".join(board[x][y] for x, y in path))
+            for path in paths
+        )
+        self.scores[score] += 1
+        if not paths:
+            self.dead_boards += 1
+        for row in board:
+            self.faces_seen.update(row)
+        for path in paths:
+            for x, y in path:
+                self.face_words[board[x][y]] += 1
+
+    def merge(self, other: "DiceStats") -> None:
+        """Adds the boards of other to these statistics."""
+        self.boards += other.boards
+        self.dead_boards += other.dead_boards
+        self.word_counts.update(other.word_counts)
+        self.scores.update(other.scores)
+        self.faces_seen.update(other.faces_seen)
+        self.face_words.update(other.face_words)
+
+    def dead_rate(self) -> Tuple[float, float, float]:
+        """Returns the share of dead boards and its 95% confidence
+        interval."""
+        return wilson_interval(self.dead_boards, self.boards)
+
+    def face_usage(self) -> Dict[str, float]:
+        """Returns the mean number of words going through every face when
+        it is on a board, most used faces first."""
+        usage = {
+            face: self.face_words[face] / seen
+            for face, seen in self.faces_seen.items()
+        }
+        return dict(sorted(usage.items(), key=lambda item: -item[1]))
+
+
+def mean_interval(histogram: Counter) -> Tuple[float, float, float]:
+    """
+    Returns the mean of a distribution and its 95% confidence interval.
+    :param histogram: the number of samples of every value.
+    :return: the mean, and the low and high ends of its interval.
+    """
+    count = sum(histogram.values())
+    if count == 0:
+        return math.nan, math.nan, math.nan
+    mean = sum(value * n for value, n in histogram.items()) / count
+    if count == 1:
+        return mean, mean, mean
+    variance = sum(
+        (value - mean) ** 2 * n for value, n in histogram.items()
+    ) / (count - 1)
+    margin = Z_95 * math.sqrt(variance / count)
+    return mean, mean - margin, mean + margin
+
+
+def wilson_interval(hits: int, count: int) -> Tuple[float, float, float]:
+    """
+    Returns a proportion and its 95% Wilson confidence interval, which
+    stays meaningful for proportions close to 0 like dead boards.
+    :param hits: the number of samples counted.
+    :param count: the number of samples.
+    :return: the proportion, and the low and high ends of its interval.
+    """
+    if count == 0:
+        return math.nan, math.nan, math.nan
+    rate = hits / count
+    z2 = Z_95 ** 2
+    center = (rate + z2 / (2 * count)) / (1 + z2 / count)
+    margin = Z_95 * math.sqrt(
+        rate * (1 - rate) / count + z2 / (4 * count ** 2)
+    ) / (1 + z2 / count)
+    return rate, max(center - margin, 0.0), min(center + margin, 1.0)
+
+
+def percentile(histogram: Counter, fraction: float) -> int:
+    """Returns the smallest value that at least fraction of the samples of
+    a distribution are not above."""
+    count = sum(histogram.values())
+    seen = 0
+    for value in sorted(histogram):
+        seen += histogram[value]
+        if seen >= fraction * count:
+            return value
+    raise ValueError("empty distribution")
+
+
+def solve_batch(
+    dice_list: List[List[str]], seed: str, boards: int, words: Lexicon
+) -> DiceStats:
+    """
+    Samples and solves a batch of boards.
+    :param dice_list: the dice set.
+    :param seed: the seed of the batch.
+    :param boards: the number of boards of the batch.
+    :param words: the words that can be formed.
+    :return: the statistics of the batch.
+    """
+    rng = random.Random(seed)
+    batch = [randomize_board(dice_list, rng) for _ in range(boards)]
+    stats = DiceStats()
+    for board, paths in zip(batch, batch_max_score_paths(batch, words)):
+        stats.add_board(board, paths)
+    return stats
+
+
+# The words of the worker processes, loaded once per process.
+_worker_words: Optional[Lexicon] = None
+
+
+def _load_worker_words(dict_path: str) -> None:
+    """Initializes a worker process with the words of a dictionary file."""
+    global _worker_words
+    with open(dict_path, "r") as f:
+        _worker_words = Lexicon(f.read().split())
+
+
+def _solve_in_worker(args: Tuple[List[List[str]], str, int]) -> DiceStats:
+    """Solves a batch with the words of the worker process."""
+    return solve_batch(*args, _worker_words)
+
+
+def analyze_dice(
+    dice_list: List[List[str]],
+    boards: int,
+    dict_path: str,
+    processes: int = 1,
+    seed: int = 0,
+    batch_boards: int = BATCH_BOARDS,
+) -> DiceStats:
+    """
+    Samples and solves boards of a dice set, optionally in parallel
+    processes.
+    :param dice_list: the dice set, at least as many dice as tiles.
+    :param boards: the number of boards sampled.
+    :param dict_path: path of the dictionary file.
+    :param processes: number of processes to use.
+    :param seed: the seed of the sampling.
+    :param batch_boards: the number of boards of a batch, the unit of work
+        of a process.
+    :return: the statistics of the boards.
+    """
+    if boards < 1:
+        raise ValueError(f"at least one board must be sampled, not {boards}")
+    batches = [
+        (dice_list, f"{seed}:{start}", min(batch_boards, boards - start))
+        for start in range(0, boards, batch_boards)
+    ]
+    stats = DiceStats()
+    if processes <= 1:
+        _load_worker_words(dict_path)
+        for batch in batches:
+            stats.merge(_solve_in_worker(batch))
+        return stats
+    with Pool(processes, _load_worker_words, (dict_path,)) as pool:
+        for batch_stats in pool.imap_unordered(_solve_in_worker, batches):
+            stats.merge(batch_stats)
+    return stats
+
+
+def format_report(stats: DiceStats, top_faces: Optional[int] = None) -> str:
+    """Returns the statistics as text.
+    :param stats: the statistics.
+    :param top_faces: if given, only the most and least used faces are
+        listed, this many of each."""
+    if not stats.boards:
+        return "0 boards"
+    rate, low, high = stats.dead_rate()
+    lines = [
+        f"{stats.boards} boards, {stats.dead_boards} dead"
+        f" ({rate:.2%}, 95% CI {low:.2%}-{high:.2%})"
+    ]
+    for name, histogram in (("words", stats.word_counts),
+                            ("max score", stats.scores)):
+        mean, low, high = mean_interval(histogram)
+        quantiles = ", ".join(
+            f"p{round(q * 100)} {percentile(histogram, q)}"
+            for q in (0.1, 0.5, 0.9)
+        )
+        lines.append(
+            f"{name:>9}: mean {mean:.1f} (95% CI {low:.1f}-{high:.1f}),"
+            f" {quantiles}, max {max(histogram)}"
+        )
+    usage = list(stats.face_usage().items())
+    if top_faces is not None and len(usage) > 2 * top_faces:
+        usage = usage[:top_faces] + usage[-top_faces:]
+    lines.append("words per face: " + ", ".join(
+        f"{face} {words:.1f}" for face, words in usage
+    ))
+    return "\n".join(lines)
+
+
+def scaling(
+    dice_list: List[List[str]],
+    boards: int,
+    dict_path: str,
+    max_processes: int,
+    seed: int = 0,
+) -> List[Tuple[int, float]]:
+    """
+    Measures how the sampling speeds up with the number of processes.
+    Every run samples the same boards, the times include starting the
+    processes and loading the dictionary in each of them.
+    :return: the boards solved per second with 1, 2, 4... processes, up to
+        max_processes.
+    """
+    results = []
+    processes = 1
+    while processes <= max_processes:
+        start = perf_counter()
+        analyze_dice(dice_list, boards, dict_path, processes, seed)
+        results.append((processes, boards / (perf_counter() - start)))
+        processes *= 2
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Sample and solve boards of a dice set."
+    )
+    parser.add_argument("--dice", help="JSON list of dice, LETTERS if unset")
+    parser.add_argument("--boards", type=int, default=10000)
+    parser.add_argument("--dict", default="boggle_dict.txt")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-boards", type=int, default=BATCH_BOARDS)
+    parser.add_argument("--top-faces", type=int)
+    parser.add_argument(
+        "--scaling",
+        type=int,
+        metavar="MAX_PROCESSES",
+        help="report boards per second with 1, 2, 4... processes instead",
+    )
+    args = parser.parse_args()
+
+    dice = LETTERS
+    if args.dice:
+        with open(args.dice, "r") as f:
+            dice = json.load(f)
+    if args.scaling:
+        for processes, speed in scaling(
+            dice, args.boards, args.dict, args.scaling, args.seed
+        ):
+            print(f"{processes:>3} processes: {speed:8.1f} boards/s")
+    else:
+        start = perf_counter()
+        result = analyze_dice(
+            dice,
+            args.boards,
+            args.dict,
+            args.processes,
+            args.seed,
+            args.batch_boards,
+        )
+        print(format_report(result, args.top_faces))
+        print(f"{args.boards / (perf_counter() - start):.1f} boards/s")
@@ -0,0 +1,166 @@
+"""
+Differential tests of the solver engines.
+
+Random boards, of random shapes and with the tiles of the game dice
+(including "QU"), are solved by every registered engine, and the results
+are compared with the reference engine:
+
+    python engine_diff.py --boards 1000 --seed 7
+
+Every engine gets the same words, by default as a Lexicon built once, so
+the fast engine does not build its trie for every board. With --plain-words
+they get a set, and the times include building whatever index an engine
+builds from it.
+"""
+import argparse
+import random
+import sys
+from time import perf_counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from boggle_board_randomizer import LETTERS
+from ex11_utils import ENGINES, REFERENCE_ENGINE, Board
+from lexicon import Lexicon
+
+SOLVERS = ("find_length_n_paths", "find_length_n_words", "max_score_paths")
+LENGTHS = (1, 2, 3, 4, 5)
+FACES = sorted({face for die in LETTERS for face in die})
+
+
+class Mismatch(NamedTuple):
+    """A result of an engine that differs from the reference engine."""
+
+    engine: str
+    solver: str
+    board: Board
+    n: Optional[int]
+
+
+class DiffReport(NamedTuple):
+    """The outcome of a differential run."""
+
+    boards: int
+    mismatches: List[Mismatch]
+    # Total seconds spent by every engine in every solver.
+    seconds: Dict[str, Dict[str, float]]
+
+
+def random_board(
+    rng: random.Random, faces: Sequence[str] = FACES, max_side: int = 5
+) -> Board:
+    """Returns a board of random shape and tiles.
+    :param rng: the random generator.
+    :param faces: the strings the tiles are drawn from.
+    :param max_side: the most rows and columns of the board."""
+    rows = rng.randint(1, max_side)
+    cols = rng.randint(1, max_side)
+    return [[rng.choice(faces) for _ in range(cols)] for _ in range(rows)]
+
+
+def __canonical(solver: str, board: Board, paths: list) -> list:
+    """Returns what must be equal in the results of two engines.
+    Paths of the find_length_n solvers must be the same, in any order.
+    max_score_paths may pick another path of the same length for a word."""
+    if solver == "max_score_paths":
+        return sorted(
+            ("".join(board[x][y] for x, y in path), len(path))
+            for path in paths
+        )
+    return sorted(tuple(map(tuple, path)) for path in paths)
+
+
+def run_differential(
+    boards: Iterable[Board],
+    words: Iterable[str],
+    engines: Optional[Sequence[str]] = None,
+    lengths: Sequence[int] = LENGTHS,
+) -> DiffReport:
+    """
+    Solves boards with several engines and compares them with the
+    reference engine.
+    :param boards: the boards to solve.
+    :param words: the words that can be formed, given to every engine.
+    :param engines: names of the engines to compare, all the registered
+        engines by default.
+    :param lengths: the values of n passed to the find_length_n solvers.
+    :return: the report of the run.
+    """
+    if engines is None:
+        engines = sorted(ENGINES)
+    names = [REFERENCE_ENGINE] + [e for e in engines if e != REFERENCE_ENGINE]
+    seconds = {name: dict.fromkeys(SOLVERS, 0.0) for name in names}
+    mismatches = []
+    count = 0
+    for board in boards:
+        count += 1
+        for solver in SOLVERS:
+            for n in lengths if solver != "max_score_paths" else (None,):
+                args = (board, words) if n is None else (n, board, words)
+                expected = None
+                for name in names:
+                    start = perf_counter()
+                    paths = getattr(ENGINES[name], solver)(*args)
+                    seconds[name][solver] += perf_counter() - start
+                    result = __canonical(solver, board, paths)
+                    if expected is None:
+                        expected = result
+                    elif result != expected:
+                        mismatches.append(Mismatch(name, solver, board, n))
+    return DiffReport(count, mismatches, seconds)
+
+
+def format_report(report: DiffReport) -> str:
+    """Returns the report as text, with the speedup of every engine over
+    the reference engine."""
+    lines = [f"{report.boards} boards, {len(report.mismatches)} mismatches"]
+    for mismatch in report.mismatches[:10]:
+        n = "" if mismatch.n is None else f" n={mismatch.n}"
+        lines.append(
+            f"  {mismatch.engine} {mismatch.solver}{n}: {mismatch.board}"
+        )
+    reference = report.seconds[REFERENCE_ENGINE]
+    for name, solvers in report.seconds.items():
+        for solver, seconds in solvers.items():
+            speedup = reference[solver] / seconds if seconds else float("inf")
+            lines.append(
+                f"{name:>12} {solver:<20} {seconds * 1000:10.1f} ms"
+                f" {speedup:8.1f}x"
+            )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the solver engines on random boards."
+    )
+    parser.add_argument("--boards", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dict", default="boggle_dict.txt")
+    parser.add_argument(
+        "--words",
+        type=int,
+        default=3000,
+        help="number of dictionary words sampled, 0 for all of them",
+    )
+    parser.add_argument("--max-side", type=int, default=5)
+    parser.add_argument(
+        "--plain-words",
+        action="store_true",
+        help="give the engines a set of words instead of a Lexicon",
+    )
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES))
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with open(args.dict, "r") as f:
+        all_words = f.read().split()
+    if 0 < args.words < len(all_words):
+        all_words = rng.sample(all_words, args.words)
+    words = set(all_words) if args.plain_words else Lexicon(all_words)
+    report = run_differential(
+        (random_board(rng, max_side=args.max_side) for _ in range(args.boards)),
+        words,
+        args.engines,
+    )
+    print(format_report(report))
+    sys.exit(1 if report.mismatches else 0)
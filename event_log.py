@@ -0,0 +1,179 @@
+import struct
+from time import monotonic
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+MAGIC = b"BGLOG\x01"
+
+# Record types. Every record starts with its type byte.
+NEW_GAME = 0
+CLICK_TILE = 1
+ADD_WORD = 2
+QUIT_GAME = 3
+SET_PATH = 4
+
+EVENT_TYPES = {"click_tile": CLICK_TILE, "add_word": ADD_WORD,
+               "quit_game": QUIT_GAME, "set_path": SET_PATH}
+
+# NEW_GAME: rows, cols, then every tile as its length and its utf-8 bytes.
+NEW_GAME_HEADER = struct.Struct("<BBB")
+# CLICK_TILE: milliseconds since the game started, y, x.
+CLICK_TILE_RECORD = struct.Struct("<BIBB")
+# ADD_WORD and QUIT_GAME: milliseconds since the game started.
+TIMED_RECORD = struct.Struct("<BI")
+# SET_PATH: milliseconds since the game started, the number of tiles, then
+# the y and x of every tile.
+SET_PATH_HEADER = struct.Struct("<BIB")
+
+BUFFER_SIZE = 1 << 16
+READ_CHUNK_SIZE = 1 << 20
+
+Event = Tuple[int, int, Optional[object]]
+
+
+class EventLogWriter:
+    """
+    Appends the events of played games to a compact binary log.
+    A game takes a few bytes per event, which are buffered in memory and
+    written in blocks, so recording never slows the game down.
+    """
+
+    def __init__(self, path: str, buffer_size: int = BUFFER_SIZE):
+        """Opens a log for appending, writing its header if it is new.
+        :param path: path of the log file.
+        :param buffer_size: number of bytes buffered before a write."""
+        self.__file = open(path, "ab", buffering=buffer_size)
+        if self.__file.tell() == 0:
+            self.__file.write(MAGIC)
+        self.__start_time = monotonic()
+
+    def __enter__(self) -> "EventLogWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __elapsed_ms(self) -> int:
+        """Returns the milliseconds since the current game started."""
+        return min(int((monotonic() - self.__start_time) * 1000), 0xFFFFFFFF)
+
+    def new_game(self, board: List[List[str]]) -> None:
+        """Records the start of a game on the given board."""
+        self.__start_time = monotonic()
+        record = bytearray(
+            NEW_GAME_HEADER.pack(NEW_GAME, len(board), len(board[0]))
+        )
+        for row in board:
+            for tile in row:
+                encoded = tile.encode("utf-8")
+                record.append(len(encoded))
+                record += encoded
+        self.__file.write(record)
+
+    def record(self, event_type: str, event_data: Optional[dict]) -> None:
+        """Records an event as given to Boggle.event_from_gui.
+        A set_path event replaces the current path with the (y, x) tiles in
+        event_data["path"], like a word typed instead of clicked.
+        Unknown event types are not recorded."""
+        code = EVENT_TYPES.get(event_type)
+        if code == CLICK_TILE:
+            self.__file.write(
+                CLICK_TILE_RECORD.pack(
+                    code, self.__elapsed_ms(), event_data["y"], event_data["x"]
+                )
+            )
+        elif code == SET_PATH:
+            path = event_data["path"]
+            record = bytearray(
+                SET_PATH_HEADER.pack(code, self.__elapsed_ms(), len(path))
+            )
+            for y, x in path:
+                record += bytes((y, x))
+            self.__file.write(record)
+        elif code is not None:
+            self.__file.write(TIMED_RECORD.pack(code, self.__elapsed_ms()))
+
+    def flush(self) -> None:
+        """Writes the buffered events to the file."""
+        self.__file.flush()
+
+    def close(self) -> None:
+        """Writes the buffered events and closes the log."""
+        self.__file.close()
+
+
+def __parse_record(buffer: bytes, offset: int) -> Optional[Tuple[Event, int]]:
+    """Parses the record starting at offset.
+    :param buffer: the bytes read so far.
+    :param offset: where the record starts.
+    :return: the event and the offset after it, None if the record is not
+        complete in the buffer."""
+    end = len(buffer)
+    if offset >= end:
+        return None
+    code = buffer[offset]
+    if code == NEW_GAME:
+        if offset + NEW_GAME_HEADER.size > end:
+            return None
+        _, rows, cols = NEW_GAME_HEADER.unpack_from(buffer, offset)
+        offset += NEW_GAME_HEADER.size
+        tiles = []
+        for _ in range(rows * cols):
+            if offset >= end or offset + 1 + buffer[offset] > end:
+                return None
+            size = buffer[offset]
+            tiles.append(buffer[offset + 1:offset + 1 + size].decode("utf-8"))
+            offset += 1 + size
+        board = [tiles[i * cols:(i + 1) * cols] for i in range(rows)]
+        return (NEW_GAME, 0, board), offset
+    if code == CLICK_TILE:
+        if offset + CLICK_TILE_RECORD.size > end:
+            return None
+        _, time_ms, y, x = CLICK_TILE_RECORD.unpack_from(buffer, offset)
+        return (CLICK_TILE, time_ms, (y, x)), offset + CLICK_TILE_RECORD.size
+    if code == SET_PATH:
+        if offset + SET_PATH_HEADER.size > end:
+            return None
+        _, time_ms, size = SET_PATH_HEADER.unpack_from(buffer, offset)
+        offset += SET_PATH_HEADER.size
+        if offset + 2 * size > end:
+            return None
+        path = [(buffer[offset + 2 * i], buffer[offset + 2 * i + 1])
+                for i in range(size)]
+        return (SET_PATH, time_ms, path), offset + 2 * size
+    if code in (ADD_WORD, QUIT_GAME):
+        if offset + TIMED_RECORD.size > end:
+            return None
+        _, time_ms = TIMED_RECORD.unpack_from(buffer, offset)
+        return (code, time_ms, None), offset + TIMED_RECORD.size
+    raise ValueError(f"Corrupted event log: unknown record type {code}")
+
+
+def read_events(
+    file: BinaryIO, chunk_size: int = READ_CHUNK_SIZE
+) -> Iterator[Event]:
+    """
+    Streams the events of a log, reading it in chunks of bounded size.
+    :param file: the log, opened in binary mode.
+    :param chunk_size: number of bytes read at a time.
+    :return: iterator of (type, milliseconds, data) events. data is the
+        board for NEW_GAME, the (y, x) tile for CLICK_TILE, the list of
+        (y, x) tiles for SET_PATH, None otherwise.
+    """
+    if file.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a Boggle event log")
+    buffer = b""
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            break
+        buffer += chunk
+        offset = 0
+        while True:
+            parsed = __parse_record(buffer, offset)
+            if parsed is None:
+                break
+            event, offset = parsed
+            yield event
+        buffer = buffer[offset:]
+    if buffer:
+        raise ValueError("Corrupted event log: truncated last record")
@@ -0,0 +1,154 @@
+import json
+from collections import deque
+from time import perf_counter
+from typing import Dict, Optional
+
+
+class LatencyHistogram:
+    """
+    Counts durations in power of two buckets of microseconds.
+    Keeps constant memory however many durations are added.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, seconds: float) -> None:
+        """Adds a duration in seconds."""
+        micros = max(int(seconds * 1_000_000), 0)
+        # Bucket b holds durations in [2 ** (b - 1), 2 ** b) microseconds.
+        bucket = micros.bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Returns the upper bound in seconds of the bucket holding the given
+        fraction of the durations, None if there are none."""
+        if self.count == 0:
+            return None
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= fraction * self.count:
+                return (1 << bucket) / 1_000_000
+        return self.max
+
+    def to_dict(self) -> dict:
+        """Returns the histogram as plain data, durations in milliseconds."""
+
+        def ms(seconds: Optional[float]) -> Optional[float]:
+            return None if seconds is None else round(seconds * 1000, 3)
+
+        return {
+            "count": self.count,
+            "mean_ms": ms(self.total / self.count) if self.count else None,
+            "min_ms": ms(self.min),
+            "max_ms": ms(self.max),
+            "p50_ms": ms(self.percentile(0.5)),
+            "p95_ms": ms(self.percentile(0.95)),
+            "p99_ms": ms(self.percentile(0.99)),
+            "buckets_us": {
+                str(1 << bucket): count
+                for bucket, count in sorted(self.buckets.items())
+            },
+        }
+
+
+class GuiInstrumentation:
+    """
+    Opt-in latency instrumentation for the Tk GUI of a game.
+    Records how long GUI events take, how much the clock ticks drift from
+    their interval and when the mainloop stalls, and dumps it all as a JSON
+    line at the end of the game.
+    """
+
+    # Interval of the stall watchdog, and the lateness counted as a stall.
+    WATCHDOG_INTERVAL_MS = 50
+    STALL_THRESHOLD_MS = 100
+    # Most stalls kept for a game, the latest ones, so a game left open
+    # with a blocked mainloop doesn't grow without bound.
+    MAX_STALLS = 1000
+
+    def __init__(self, path: str):
+        """:param path: file the measurements are appended to."""
+        self.__path = path
+        self.__latencies: Dict[str, LatencyHistogram] = {}
+        self.__drift = LatencyHistogram()
+        self.__last_tick: Optional[float] = None
+        self.__stalls = deque(maxlen=self.MAX_STALLS)
+        self.__root = None
+        self.__watchdog_due: Optional[float] = None
+
+    def start(self) -> float:
+        """Returns a start time for record."""
+        return perf_counter()
+
+    def record(self, name: str, start: float) -> None:
+        """Records the time elapsed since start for an event.
+        :param name: the event, like "click_tile".
+        :param start: the value returned by start."""
+        histogram = self.__latencies.setdefault(name, LatencyHistogram())
+        histogram.add(perf_counter() - start)
+
+    def record_after_render(self, root, name: str, start: float) -> None:
+        """Records the time until Tk is idle again, after it redrew what
+        the event changed.
+        :param root: the Tk window.
+        :param name: the event, like "click_tile_render".
+        :param start: the value returned by start."""
+        root.after_idle(lambda: self.record(name, start))
+
+    def clock_tick(self, interval_ms: int) -> None:
+        """Records the drift of a clock expected to tick every interval_ms."""
+        now = perf_counter()
+        if self.__last_tick is not None:
+            self.__drift.add(abs(now - self.__last_tick - interval_ms / 1000))
+        self.__last_tick = now
+
+    def watch(self, root) -> None:
+        """Starts detecting mainloop stalls in the given Tk window.
+        A stall is the watchdog callback running more than
+        STALL_THRESHOLD_MS later than it was scheduled."""
+        self.__root = root
+        self.__last_tick = None
+        self.__schedule_watchdog()
+
+    def __schedule_watchdog(self) -> None:
+        self.__watchdog_due = perf_counter() + self.WATCHDOG_INTERVAL_MS / 1000
+        self.__root.after(self.WATCHDOG_INTERVAL_MS, self.__watchdog)
+
+    def __watchdog(self) -> None:
+        lateness = perf_counter() - self.__watchdog_due
+        if lateness * 1000 > self.STALL_THRESHOLD_MS:
+            self.__stalls.append(round(lateness * 1000, 3))
+        self.__schedule_watchdog()
+
+    def to_dict(self) -> dict:
+        """Returns all the measurements as plain data."""
+        return {
+            "latency": {
+                name: histogram.to_dict()
+                for name, histogram in sorted(self.__latencies.items())
+            },
+            "clock_drift": self.__drift.to_dict(),
+            "stalls_ms": list(self.__stalls),
+        }
+
+    def dump(self) -> None:
+        """Appends the measurements to the file as a JSON line and resets
+        them for the next game. Nothing is written if no game was played."""
+        if not self.__latencies and self.__last_tick is None:
+            return
+        with open(self.__path, "a") as f:
+            f.write(json.dumps(self.to_dict()) + "\n")
+        self.__latencies = {}
+        self.__drift = LatencyHistogram()
+        self.__last_tick = None
+        self.__stalls.clear()
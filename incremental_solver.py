@@ -0,0 +1,215 @@
+"""
+Incremental board solving, for board optimization.
+
+Hill climbing and simulated annealing change one tile at a time. Instead of
+solving the whole board after every change, IncrementalSolver keeps every
+path of the board spelling the start of a word, and only searches again the
+paths going through the changed tile.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from board_encoding import BLANK_LETTERS, UNKNOWN, EncodedBoard
+from ex11_utils import Board, word_score
+from lexicon import ROOT, Lexicon
+
+
+# A path of the board spelling the start of a word: the node it reaches,
+# the bitmask of its cells and the cell it ends at.
+Prefix = Tuple[int, int, int]
+
+
+class IncrementalSolver:
+    """
+    The solution of a board that follows changes of its tiles.
+    A word scores like in the game, its word_score, as long as some path
+    spells it. The lexicon must not change while the solver is used.
+    """
+
+    def __init__(self, board: Board, words: Iterable[str]):
+        """Solves a board.
+        :param board: two dimensional list of strings representing the board.
+        :param words: the words that can be formed, preferably a Lexicon."""
+        if not isinstance(words, Lexicon):
+            words = Lexicon(words)
+        self.__lexicon = words
+        self.__board = [list(row) for row in board]
+        encoded = EncodedBoard(self.__board, words.alphabet)
+        self.__encoded = encoded
+        self.__cols = encoded.cols
+        self.__letters = encoded.letters
+        self.__neighbours = encoded.neighbours
+        # The prefixes ending at every cell, the prefixes extending every
+        # prefix by a tile, and the number of prefixes spelling every word.
+        self.__ends: List[Set[Prefix]] = [set() for _ in range(len(encoded))]
+        self.__extensions: Dict[Prefix, List[Prefix]] = {}
+        self.__paths: Dict[int, int] = {}
+        # The score of every word on the board.
+        self.__scores: Dict[int, int] = {}
+        self.__score = 0
+        for node in self.__search(None):
+            self.__update_score(node)
+
+    @property
+    def board(self) -> Board:
+        """A copy of the current board."""
+        return [list(row) for row in self.__board]
+
+    @property
+    def score(self) -> int:
+        """The score of the current board."""
+        return self.__score
+
+    def words(self) -> List[str]:
+        """Returns the words that can be formed on the current board."""
+        return [self.__lexicon.word_at(node) for node in self.__scores]
+
+    def set_tile(self, x: int, y: int, tile: str) -> int:
+        """
+        Changes a tile and updates the solution.
+        The prefixes through the tile, the ones ending at it and their
+        extensions, are removed. Then the prefixes ending next to it are
+        extended through its new letters. The other prefixes are not looked
+        at.
+        :param x: the row of the tile.
+        :param y: the column of the tile.
+        :param tile: the new string of the tile.
+        :return: the change of the score.
+        """
+        cell = x * self.__cols + y
+        old_score = self.__score
+        _, _, _, terminal = self.__lexicon.tables()
+        ends = self.__ends
+        extensions = self.__extensions
+        paths = self.__paths
+        changed = set()
+        removed = list(ends[cell])
+        ends[cell] = set()
+        while removed:
+            prefix = removed.pop()
+            node, visited, end = prefix
+            if end != cell:
+                end_prefixes = ends[end]
+                # A prefix is only the extension of the first prefix it
+                # was found from, but the lists keep the ones removed.
+                if prefix not in end_prefixes:
+                    continue
+                end_prefixes.remove(prefix)
+            if terminal[node]:
+                changed.add(node)
+                paths[node] -= 1
+            removed += extensions.pop(prefix, ())
+
+        self.__board[x][y] = tile
+        self.__encoded.set_tile(cell, tile)
+        changed |= self.__search(cell)
+        for node in changed:
+            self.__update_score(node)
+        return self.__score - old_score
+
+    def __update_score(self, node: int) -> None:
+        """Updates the score after the paths of a word changed."""
+        if self.__paths.get(node):
+            if node not in self.__scores:
+                score = word_score(self.__lexicon.word_at(node))
+                self.__scores[node] = score
+                self.__score += score
+        else:
+            self.__paths.pop(node, None)
+            self.__score -= self.__scores.pop(node, 0)
+
+    def __search(self, through: Optional[int]) -> Set[int]:
+        """
+        Adds the prefixes of the words on the board.
+        :param through: if not None, only prefixes through this cell are
+            added, the others must already be there.
+        :return: the nodes of the words whose paths were added.
+        """
+        base, check, counts, terminal = self.__lexicon.tables()
+        letters = self.__letters
+        neighbours = self.__neighbours
+        ends = self.__ends
+        extensions = self.__extensions
+        paths = self.__paths
+        found = set()
+        lexicon = self.__lexicon
+        # The letter of every cell holding a single letter, the trie is
+        # walked inline for them.
+        single = [
+            tile_letters[0]
+            if len(tile_letters) == 1 and tile_letters is not BLANK_LETTERS
+            and tile_letters[0] != UNKNOWN else None
+            for tile_letters in letters
+        ]
+
+        def step(node: int, cell: int) -> Sequence[int]:
+            """Returns the nodes reached by spelling the tile of a cell."""
+            if letters[cell] is BLANK_LETTERS:
+                return [child for child in lexicon.children(node)
+                        if counts[child]]
+            for letter in letters[cell]:
+                child = base[node] + letter
+                if letter == UNKNOWN or check[child] != node \
+                        or not counts[child]:
+                    return ()
+                node = child
+            return (node,)
+
+        def extend(
+            cell: int, node: int, visited: int, added: List[Prefix]
+        ) -> None:
+            """Adds a prefix that reached node at cell to added, and the
+            prefixes extending it."""
+            visited |= 1 << cell
+            prefix = (node, visited, cell)
+            cell_ends = ends[cell]
+            # Prefixes with the same end, cells and node have the same
+            # extensions, which are already there.
+            if prefix in cell_ends:
+                return
+            cell_ends.add(prefix)
+            added.append(prefix)
+            if terminal[node]:
+                found.add(node)
+                paths[node] = paths.get(node, 0) + 1
+            below: List[Prefix] = []
+            first = base[node]
+            for new_cell in neighbours[cell]:
+                if visited >> new_cell & 1:
+                    continue
+                letter = single[new_cell]
+                if letter is None:
+                    for child in step(node, new_cell):
+                        extend(new_cell, child, visited, below)
+                    continue
+                child = first + letter
+                if check[child] == node and counts[child]:
+                    extend(new_cell, child, visited, below)
+            if below:
+                extensions[prefix] = below
+
+        starts = range(len(letters)) if through is None else (through,)
+        for cell in starts:
+            for node in step(ROOT, cell):
+                extend(cell, node, 0, [])
+        if through is not None:
+            bit = 1 << through
+            for cell in neighbours[through]:
+                # Extending adds prefixes ending here, all through the cell.
+                for prefix in tuple(ends[cell]):
+                    node, visited, _ = prefix
+                    if visited & bit:
+                        continue
+                    below = extensions.get(prefix)
+                    if below is None:
+                        below = []
+                    else:
+                        # Drop the extensions removed with the old tile.
+                        below = [added for added in below
+                                 if added[2] != through]
+                    for child in step(node, through):
+                        extend(through, child, visited, below)
+                    if below:
+                        extensions[prefix] = below
+                    else:
+                        extensions.pop(prefix, None)
+        return found
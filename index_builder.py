@@ -0,0 +1,162 @@
+"""
+Streaming builder of lexicon indexes.
+
+Builds the binary index read by Lexicon.load from a word file of any size:
+
+    python index_builder.py words.txt words.txt.idx --chunk-words 1000000
+
+The file is read line by line. If its words are not sorted, they are sorted
+with an external merge sort: chunks of chunk_words words are sorted in
+memory and written to temporary run files, which are then merged. The
+sorted words are streamed into the trie, so besides the trie only a chunk
+of words is ever held in memory. The trie is a few flat arrays, placed as
+the words arrive and written to the index as they are, without copies.
+"""
+import argparse
+import heapq
+import os
+import shutil
+import tempfile
+from typing import Iterable, Iterator, List, Optional
+
+from lexicon import Lexicon
+
+CHUNK_WORDS = 1_000_000
+# Most run files merged at once, more are merged in several passes.
+MAX_OPEN_RUNS = 64
+
+
+def read_words(path: str) -> Iterator[str]:
+    """Streams the whitespace separated words of a utf-8 file."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            yield from line.split()
+
+
+def is_sorted(words: Iterable[str]) -> bool:
+    """Returns True if the words are in sorted order."""
+    previous = None
+    for word in words:
+        if previous is not None and word < previous:
+            return False
+        previous = word
+    return True
+
+
+def __write_run(words: List[str], directory: str, number: int) -> str:
+    """Writes sorted words to a run file and returns its path."""
+    path = os.path.join(directory, f"run{number}.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        for word in words:
+            f.write(word + "\n")
+    return path
+
+
+def __merge_runs(paths: List[str], directory: str, number: int) -> str:
+    """Merges run files into a new run file and returns its path."""
+    files = [open(path, "r", encoding="utf-8") for path in paths]
+    try:
+        merged = heapq.merge(*(map(str.rstrip, f) for f in files))
+        merged_path = os.path.join(directory, f"run{number}.txt")
+        with open(merged_path, "w", encoding="utf-8") as out:
+            for word in merged:
+                out.write(word + "\n")
+    finally:
+        for f in files:
+            f.close()
+    for path in paths:
+        os.remove(path)
+    return merged_path
+
+
+def external_sort(
+    words: Iterable[str],
+    chunk_words: int = CHUNK_WORDS,
+    tmp_dir: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    Sorts words with bounded memory.
+    :param words: the words to sort, in any order.
+    :param chunk_words: the most words sorted in memory at once.
+    :param tmp_dir: where the run files are written, the system temporary
+        directory by default. They are removed when the iterator ends.
+    :return: iterator of the words in sorted order, with repetitions.
+    """
+    directory = tempfile.mkdtemp(prefix="lexicon-sort-", dir=tmp_dir)
+    try:
+        runs = []
+        chunk = []
+        for word in words:
+            chunk.append(word)
+            if len(chunk) >= chunk_words:
+                chunk.sort()
+                runs.append(__write_run(chunk, directory, len(runs)))
+                chunk = []
+        chunk.sort()
+        if not runs:
+            # Everything fit in a single chunk.
+            yield from chunk
+            return
+        runs.append(__write_run(chunk, directory, len(runs)))
+        del chunk
+        number = len(runs)
+        while len(runs) > MAX_OPEN_RUNS:
+            merged = []
+            for start in range(0, len(runs), MAX_OPEN_RUNS):
+                merged.append(__merge_runs(
+                    runs[start:start + MAX_OPEN_RUNS], directory, number
+                ))
+                number += 1
+            runs = merged
+        files = [open(path, "r", encoding="utf-8") for path in runs]
+        try:
+            yield from heapq.merge(*(map(str.rstrip, f) for f in files))
+        finally:
+            for f in files:
+                f.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def build_index(
+    dict_path: str,
+    index_path: str,
+    chunk_words: int = CHUNK_WORDS,
+    tmp_dir: Optional[str] = None,
+) -> Lexicon:
+    """
+    Builds the index of a word file and writes it to disk.
+    A sorted file is streamed straight into the trie, other files are
+    sorted first with external_sort.
+    :param dict_path: the word file, whitespace separated words in utf-8.
+    :param index_path: where the index is written.
+    :param chunk_words: the most words sorted in memory at once.
+    :param tmp_dir: where the run files of the sort are written.
+    :return: the lexicon that was written.
+    """
+    if is_sorted(read_words(dict_path)):
+        words = read_words(dict_path)
+    else:
+        words = external_sort(read_words(dict_path), chunk_words, tmp_dir)
+    lexicon = Lexicon.from_sorted(words)
+    lexicon.save(index_path)
+    return lexicon
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build a lexicon index from a word file of any size."
+    )
+    parser.add_argument("dict", help="word file")
+    parser.add_argument("index", nargs="?", help="<dict>.idx by default")
+    parser.add_argument("--chunk-words", type=int, default=CHUNK_WORDS)
+    parser.add_argument("--tmp-dir", help="directory of the sort's runs")
+    args = parser.parse_args()
+
+    lexicon = build_index(
+        args.dict,
+        args.index or args.dict + ".idx",
+        args.chunk_words,
+        args.tmp_dir,
+    )
+    print(f"{len(lexicon)} words")
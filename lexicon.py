@@ -0,0 +1,646 @@
+import struct
+import sys
+from array import array
+from typing import (Callable, Dict, Iterable, Iterator, List, MutableSequence,
+                    Optional, Sequence, Tuple)
+
+from board_encoding import Alphabet
+
+# Listeners are called with the word and True if it was added,
+# False if it was removed.
+Listener = Callable[[str, bool], None]
+
+ROOT = 0
+
+# Check of the positions of the double array that hold no node.
+FREE = -1
+
+# Completion length of nodes with no word below them.
+NO_COMPLETION = -1
+
+# Version of the binary index written by Lexicon.save.
+INDEX_MAGIC = b"BGLEX\x03"
+# The number of positions of the double array, the size of the letters in
+# utf-8 and the number of word lengths counted.
+INDEX_HEADER = struct.Struct("<III")
+# A word length and the number of words of that length.
+LENGTH_COUNT = struct.Struct("<II")
+
+
+def find_base(
+    check: MutableSequence[int], codes: Sequence[int], start: int = 1
+) -> int:
+    """
+    Finds where the children of a node fit in a double array.
+    :param check: the check array, FREE where no node is.
+    :param codes: the sorted letter codes of the children.
+    :param start: no position before this one is free.
+    :return: the lowest base b from 1 such that b + code is free for every
+        code, positions past the end of check being free.
+    """
+    first = codes[0]
+    size = len(check)
+    position = max(start, first + 1)
+    while position < size:
+        try:
+            position = check.index(FREE, position)
+        except ValueError:
+            break
+        base = position - first
+        for code in codes:
+            if base + code < size and check[base + code] != FREE:
+                break
+        else:
+            return base
+        position += 1
+    return max(size, first + 1) - first
+
+
+class Lexicon:
+    """
+    A mutable dictionary of words kept as a trie.
+    Every node counts the words below it, so adding or removing a word only
+    walks the word's letters and a partial word is live as long as its
+    count is positive. A Lexicon can be passed as the words of every
+    ex11_utils function instead of a list or a set.
+    Letters are stored as the integer codes of the lexicon's alphabet, so
+    the solvers walk the trie without building any strings.
+    The trie is a double array of flat integer arrays: the child of a node
+    for a letter code is at position base[node] + code, and belongs to the
+    node if check at that position is the node. Nodes are numbered by their
+    position, and adding a word may move the children of a node to make
+    room for a new one, so node numbers are only valid until the next add.
+    """
+
+    # Every node knows the exact number of words below it.
+    exact = True
+
+    def __init__(self, words: Iterable[str] = ()):
+        """Creates a lexicon holding the given words."""
+        self.__alphabet = Alphabet()
+        self.__base = array("i", [0])
+        self.__check = array("i", [FREE])
+        self.__counts = array("i", [0])
+        self.__terminal = bytearray(1)
+        self.__length_counts: Dict[int, int] = {}
+        self.__completion_lengths: Optional[Tuple[array, array]] = None
+        self.__listeners: List[Listener] = []
+        # Sorted words share their prefixes with the word before them,
+        # which keeps the trie walk in cache.
+        self.__build(sorted(words))
+
+    @classmethod
+    def from_sorted(cls, words: Iterable[str]) -> "Lexicon":
+        """
+        Creates a lexicon from words that are already sorted.
+        The words are streamed into the trie, never held in a list, so an
+        iterator over a sorted file only costs the memory of the trie.
+        Repeated words are added once.
+        :param words: the words, in sorted order.
+        :return: the lexicon.
+        """
+        lexicon = cls()
+        lexicon.__build(words)
+        return lexicon
+
+    def __grow(self, size: int) -> None:
+        """Extends the arrays with free positions up to size.
+        The arrays are extended in place, so the references the methods
+        bound to local names stay valid."""
+        missing = size - len(self.__check)
+        if missing > 0:
+            self.__base.extend(array("i", [0]) * missing)
+            self.__check.extend(array("i", [FREE]) * missing)
+            self.__counts.extend(array("i", [0]) * missing)
+            self.__terminal.extend(bytes(missing))
+
+    def __add_letter(self, letter: str) -> int:
+        """Returns the code of a letter, adding it to the alphabet.
+        Every base plus every code must be a position of the arrays, so
+        they get one more position with every new letter."""
+        letters = len(self.__alphabet)
+        code = self.__alphabet.add_letter(letter)
+        if len(self.__alphabet) > letters:
+            self.__grow(len(self.__check) + 1)
+        return code
+
+    def __next_free(self, start: int) -> int:
+        """Returns the first free position from start, or the size of the
+        arrays if there is none."""
+        try:
+            return self.__check.index(FREE, start)
+        except ValueError:
+            return len(self.__check)
+
+    def __add_child(self, node: int, code: int) -> int:
+        """Creates the child of a node for a letter code and returns it.
+        If its position is taken, the other children of the node are moved
+        with it to the end of the arrays, where they all fit without
+        searching for free positions. Their old positions are freed, and
+        only reused by the children of other nodes that happen to fall
+        there."""
+        base = self.__base
+        check = self.__check
+        counts = self.__counts
+        terminal = self.__terminal
+        old_base = base[node]
+        if not old_base or check[old_base + code] != FREE:
+            old_codes = [child - old_base for child in self.children(node)]
+            new_base = len(check) - min(old_codes + [code])
+            self.__grow(new_base + len(self.__alphabet))
+            for old_code in old_codes:
+                old = old_base + old_code
+                new = new_base + old_code
+                base[new] = base[old]
+                check[new] = node
+                counts[new] = counts[old]
+                terminal[new] = terminal[old]
+                for grandchild in self.children(old):
+                    check[grandchild] = new
+                base[old] = counts[old] = terminal[old] = 0
+                check[old] = FREE
+            base[node] = new_base
+        child = base[node] + code
+        check[child] = node
+        return child
+
+    def __build(self, words: Iterable[str]) -> None:
+        """Fills an empty lexicon with sorted words, without notifying
+        listeners.
+        The children of a node are placed in the double array once they are
+        all known, after the last word below the node, so unlike add no node
+        is ever moved. Until then only the nodes of the last word are kept
+        apart, with the children placed so far."""
+        base = self.__base
+        check = self.__check
+        counts = self.__counts
+        terminal = self.__terminal
+        alphabet = self.__alphabet
+        length_counts = self.__length_counts
+        letter_codes = {}
+        # The open nodes, from the root to the node of the last word: the
+        # letter codes leading to them, whether they end a word, and their
+        # placed children as (code, base, codes of its children, count,
+        # terminal).
+        path: List[int] = []
+        open_terminal = [0]
+        open_placed: List[List[tuple]] = [[]]
+        # The first position that may be free and the highest base.
+        free = 1
+        top = 0
+        letters = 0
+        next_free = self.__next_free
+
+        def close() -> None:
+            """Places the children of the deepest open node, and makes the
+            node a placed child of its parent."""
+            nonlocal free, top
+            placed = open_placed.pop()
+            is_terminal = open_terminal.pop()
+            if not placed:
+                # Leaves end a word.
+                open_placed[-1].append((path.pop(), 0, (), 1, 1))
+                return
+            if len(placed) == 1:
+                # The first free position fits a single child.
+                code = placed[0][0]
+                codes = (code,)
+                first = (free if free > code else next_free(code + 1)) - code
+            else:
+                codes = [child[0] for child in placed]
+                first = find_base(check, sorted(codes), free)
+            if first > top:
+                top = first
+            if first + letters > len(check):
+                # Grown by half at once, the unused end is cut off after
+                # the last word.
+                self.__grow(max(first + letters, len(check) * 3 // 2))
+            count = is_terminal
+            for code, child_base, child_codes, child_count, child_terminal \
+                    in placed:
+                child = first + code
+                base[child] = child_base
+                # Set again when the node is placed, the children of the
+                # root keep it.
+                check[child] = ROOT
+                counts[child] = child_count
+                terminal[child] = child_terminal
+                for child_code in child_codes:
+                    check[child_base + child_code] = child
+                count += child_count
+            if check[free] != FREE:
+                free = next_free(free)
+            if path:
+                open_placed[-1].append(
+                    (path.pop(), first, codes, count, is_terminal)
+                )
+            else:
+                base[ROOT] = first
+                counts[ROOT] = count
+
+        previous = None
+        for word in words:
+            if previous is None:
+                common = 0
+            elif word.startswith(previous):
+                if word == previous:
+                    continue
+                common = len(previous)
+            elif word < previous:
+                raise ValueError(f"{word!r} is sorted after {previous!r}")
+            else:
+                # Sorted words mostly share all but their last letters, so
+                # the common prefix is searched from its longest possible.
+                common = min(len(word), len(previous)) - 1
+                while common and (word[common - 1] != previous[common - 1]
+                                  or word[:common] != previous[:common]):
+                    common -= 1
+            while len(path) > common:
+                close()
+            for letter in word[common:]:
+                code = letter_codes.get(letter)
+                if code is None:
+                    code = letter_codes[letter] = self.__add_letter(letter)
+                    letters = len(alphabet)
+                path.append(code)
+                open_terminal.append(0)
+                open_placed.append([])
+            open_terminal[-1] = 1
+            length_counts[len(word)] = length_counts.get(len(word), 0) + 1
+            previous = word
+        while path:
+            close()
+        terminal[ROOT] = open_terminal[ROOT]
+        counts[ROOT] = terminal[ROOT]
+        if open_placed[ROOT]:
+            close()
+        for values in (base, check, counts, terminal):
+            del values[max(top + len(alphabet), 1):]
+        self.__completion_lengths = None
+
+    def save(self, path: str) -> None:
+        """
+        Writes the trie to a binary index file.
+        Loading the index with Lexicon.load is several times faster than
+        building the trie from the words again. The completion lengths are
+        saved too, so they are not computed again after loading. The arrays
+        are written one after the other as little endian integers.
+        :param path: path of the index file.
+        """
+        shortest, longest = self.completion_lengths()
+        alphabet = self.__alphabet
+        letters = "".join(
+            alphabet.letter(code) for code in range(len(alphabet))
+        ).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(INDEX_MAGIC)
+            f.write(INDEX_HEADER.pack(
+                len(self.__check), len(letters), len(self.__length_counts)
+            ))
+            f.write(letters)
+            for length, count in sorted(self.__length_counts.items()):
+                f.write(LENGTH_COUNT.pack(length, count))
+            for values in (self.__base, self.__check, self.__counts,
+                           shortest, longest):
+                if sys.byteorder == "big":
+                    values = array("i", values)
+                    values.byteswap()
+                values.tofile(f)
+            f.write(self.__terminal)
+
+    @classmethod
+    def load(cls, path: str) -> "Lexicon":
+        """Reads a lexicon from an index file written by save.
+        :param path: path of the index file.
+        :return: the lexicon."""
+        lexicon = cls()
+        with open(path, "rb") as f:
+            if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                raise ValueError(f"{path} is not a lexicon index")
+            size, letters_size, lengths = INDEX_HEADER.unpack(
+                f.read(INDEX_HEADER.size)
+            )
+            for letter in f.read(letters_size).decode("utf-8"):
+                lexicon.__alphabet.add_letter(letter)
+            for _ in range(lengths):
+                length, count = LENGTH_COUNT.unpack(f.read(LENGTH_COUNT.size))
+                lexicon.__length_counts[length] = count
+            arrays = []
+            try:
+                for _ in range(5):
+                    values = array("i")
+                    values.fromfile(f, size)
+                    if sys.byteorder == "big":
+                        values.byteswap()
+                    arrays.append(values)
+            except EOFError:
+                raise ValueError(f"{path} is truncated") from None
+            terminal = bytearray(f.read(size))
+        if len(terminal) != size:
+            raise ValueError(f"{path} is truncated")
+        (
+            lexicon.__base,
+            lexicon.__check,
+            lexicon.__counts,
+            shortest,
+            longest,
+        ) = arrays
+        lexicon.__terminal = terminal
+        lexicon.__completion_lengths = (shortest, longest)
+        return lexicon
+
+    def __node(self, string: str) -> Optional[int]:
+        """Returns the node reached by the letters of string, if any."""
+        node = ROOT
+        base = self.__base
+        check = self.__check
+        letter_code = self.__alphabet.letter_code
+        for letter in string:
+            code = letter_code(letter)
+            child = base[node] + code
+            if code < 0 or not base[node] or check[child] != node:
+                return None
+            node = child
+        return node
+
+    def __insert(self, word: str) -> bool:
+        """Adds a word without notifying listeners.
+        :return: True if the word was not in the lexicon."""
+        if word in self:
+            return False
+        base = self.__base
+        check = self.__check
+        counts = self.__counts
+        node = ROOT
+        for letter in word:
+            code = self.__add_letter(letter)
+            first = base[node]
+            child = first + code
+            if not first or check[child] != node:
+                child = self.__add_child(node, code)
+            node = child
+        self.__terminal[node] = 1
+        while node != ROOT:
+            counts[node] += 1
+            node = check[node]
+        counts[ROOT] += 1
+        self.__length_counts[len(word)] = \
+            self.__length_counts.get(len(word), 0) + 1
+        self.__completion_lengths = None
+        return True
+
+    def add(self, word: str) -> bool:
+        """
+        Adds a word to the lexicon.
+        It walks the letters of the word, and moves the children of a node
+        when the position of a new child is taken, so it costs
+        O(len(word) * letters ** 2) at worst for an alphabet of that many
+        letters, tens of microseconds. A lexicon grown by many adds takes
+        more memory than one built from the same words.
+        :return: True if the word was added, False if it was already there.
+        """
+        if not self.__insert(word):
+            return False
+        for listener in self.__listeners:
+            listener(word, True)
+        return True
+
+    def remove(self, word: str) -> bool:
+        """Removes a word from the lexicon in O(len(word)).
+        The nodes of the word are kept, with their counts lowered.
+        :return: True if the word was removed, False if it wasn't there."""
+        node = self.__node(word)
+        if node is None or not self.__terminal[node]:
+            return False
+        self.__terminal[node] = 0
+        while node != ROOT:
+            self.__counts[node] -= 1
+            node = self.__check[node]
+        self.__counts[ROOT] -= 1
+        self.__length_counts[len(word)] -= 1
+        if self.__length_counts[len(word)] == 0:
+            del self.__length_counts[len(word)]
+        self.__completion_lengths = None
+        for listener in self.__listeners:
+            listener(word, False)
+        return True
+
+    def has_prefix(self, string: str) -> bool:
+        """Returns True if some word of the lexicon starts with string."""
+        node = self.__node(string)
+        return node is not None and self.__counts[node] > 0
+
+    @property
+    def alphabet(self) -> Alphabet:
+        """The alphabet coding the letters of the trie."""
+        return self.__alphabet
+
+    @property
+    def prefixes(self) -> "PrefixView":
+        """A view of all the partial words, for membership tests."""
+        return PrefixView(self)
+
+    @property
+    def max_word_length(self) -> int:
+        """The length of the longest word, 0 if the lexicon is empty."""
+        return max(self.__length_counts, default=0)
+
+    def tables(self) -> Tuple[array, array, array, bytearray]:
+        """
+        Returns the arrays of the trie for the solvers' hot loops.
+        The arrays are shared, not copied, and must not be changed. The
+        child of node for a letter code is
+            child = base[node] + code
+        if base[node] is not 0 and check[child] == node, so check also
+        gives the node above every node. Every base plus the code of any
+        letter of the alphabet is a position of the arrays.
+        :return: (base, check, counts, terminal) where counts is the number
+            of words below a node and terminal is 1 for nodes ending a word.
+        """
+        return self.__base, self.__check, self.__counts, self.__terminal
+
+    def children(self, node: int) -> List[int]:
+        """Returns the child nodes of a node, live or not."""
+        first = self.__base[node]
+        if not first:
+            return []
+        check = self.__check
+        return [
+            child
+            for child in range(first, first + len(self.__alphabet))
+            if check[child] == node
+        ]
+
+    def completion_lengths(self) -> Tuple[array, array]:
+        """
+        Returns the lengths of the words below every node, counted from it.
+        The solvers use them to skip partial words that cannot grow into a
+        word of the length they look for. They are computed on first use
+        and again after the lexicon changes.
+        :return: (shortest, longest) where shortest[node] and longest[node]
+            are the fewest and most letters to add to the partial word of
+            node to form a word, NO_COMPLETION if no word is below node.
+        """
+        if self.__completion_lengths is None:
+            check = self.__check
+            counts = self.__counts
+            terminal = self.__terminal
+            size = len(check)
+            # Children may be at lower positions than their parent, so the
+            # live nodes are walked from the deepest up.
+            depths = array("i", [-1]) * size
+            depths[ROOT] = 0
+            levels: List[array] = [array("i")]
+            for node in range(size):
+                if not counts[node] or depths[node] >= 0:
+                    continue
+                above = []
+                while depths[node] < 0:
+                    above.append(node)
+                    node = check[node]
+                depth = depths[node]
+                for node in reversed(above):
+                    depth += 1
+                    depths[node] = depth
+                    if depth == len(levels):
+                        levels.append(array("i"))
+                    levels[depth].append(node)
+            shortest = array("i", [NO_COMPLETION]) * size
+            longest = array("i", [NO_COMPLETION]) * size
+            if counts[ROOT]:
+                for level in reversed(levels[1:]):
+                    for node in level:
+                        if terminal[node]:
+                            shortest[node] = 0
+                            if longest[node] < 0:
+                                longest[node] = 0
+                        parent = check[node]
+                        low = shortest[node] + 1
+                        if shortest[parent] < 0 or low < shortest[parent]:
+                            shortest[parent] = low
+                        if longest[node] + 1 > longest[parent]:
+                            longest[parent] = longest[node] + 1
+            if terminal[ROOT]:
+                shortest[ROOT] = 0
+                longest[ROOT] = max(longest[ROOT], 0)
+            self.__completion_lengths = (shortest, longest)
+        return self.__completion_lengths
+
+    def word_at(self, node: int) -> str:
+        """Returns the string spelled from the root to a node."""
+        codes = []
+        base = self.__base
+        check = self.__check
+        while node != ROOT:
+            parent = check[node]
+            codes.append(node - base[parent])
+            node = parent
+        return self.__alphabet.decode(tuple(reversed(codes)))
+
+    def depth(self, node: int) -> int:
+        """Returns the number of letters spelled from the root to a node."""
+        depth = 0
+        check = self.__check
+        while node != ROOT:
+            node = check[node]
+            depth += 1
+        return depth
+
+    def node_of(self, string: str) -> Optional[int]:
+        """Returns the node spelled by a string, None if there is none."""
+        return self.__node(string)
+
+    def subscribe(self, listener: Listener) -> None:
+        """Calls listener with (word, added) after every add or remove."""
+        self.__listeners.append(listener)
+
+    def unsubscribe(self, listener: Listener) -> None:
+        """Stops calling a listener given to subscribe."""
+        self.__listeners.remove(listener)
+
+    def __contains__(self, word: object) -> bool:
+        if not isinstance(word, str):
+            return False
+        node = self.__node(word)
+        return node is not None and self.__terminal[node] == 1
+
+    def __len__(self) -> int:
+        return self.__counts[ROOT]
+
+    def __iter__(self) -> Iterator[str]:
+        terminal = self.__terminal
+        node = terminal.find(1)
+        while node >= 0:
+            yield self.word_at(node)
+            node = terminal.find(1, node + 1)
+
+
+class PrefixView:
+    """Membership view of the partial words of a lexicon."""
+
+    def __init__(self, lexicon: Lexicon):
+        self.__lexicon = lexicon
+
+    def __contains__(self, string: object) -> bool:
+        return isinstance(string, str) and self.__lexicon.has_prefix(string)
+
+
+class SolutionCache:
+    """
+    Caches the words found on boards for a lexicon.
+    When a word is added to or removed from the lexicon only that word is
+    updated in the cached solutions, instead of solving the boards again.
+    """
+
+    def __init__(self, lexicon: Lexicon):
+        self.__lexicon = lexicon
+        self.__solutions: Dict[tuple, Dict[str, list]] = {}
+        lexicon.subscribe(self.__on_change)
+
+    @staticmethod
+    def __key(board: List[List[str]]) -> tuple:
+        return tuple(tuple(row) for row in board)
+
+    def solve(self, board: List[List[str]]) -> Dict[str, list]:
+        """Returns the longest path of every word on a board.
+        :param board: two dimensional list of strings representing the board.
+        :return: dict from every word that can be formed to its path."""
+        key = self.__key(board)
+        if key not in self.__solutions:
+            self.__solutions[key] = self.__find(board, self.__lexicon)
+        return self.__solutions[key]
+
+    def invalidate(self, board: Optional[List[List[str]]] = None) -> None:
+        """Forgets the solution of a board, or of all boards if None."""
+        if board is None:
+            self.__solutions.clear()
+        else:
+            self.__solutions.pop(self.__key(board), None)
+
+    def close(self) -> None:
+        """Stops following changes of the lexicon."""
+        self.__lexicon.unsubscribe(self.__on_change)
+
+    def __len__(self) -> int:
+        return len(self.__solutions)
+
+    @staticmethod
+    def __find(
+        board: List[List[str]], words: Iterable[str]
+    ) -> Dict[str, list]:
+        """Solves a board for the given words."""
+        # Imported here since ex11_utils itself uses Lexicon.
+        from ex11_utils import ONE_PATH_PER_WORD, max_score_words
+
+        if not words:
+            return {}
+        return dict(max_score_words(board, words, mode=ONE_PATH_PER_WORD))
+
+    def __on_change(self, word: str, added: bool) -> None:
+        """Updates the cached solutions for a single word."""
+        for key, solution in self.__solutions.items():
+            if not added:
+                solution.pop(word, None)
+                continue
+            board = [list(row) for row in key]
+            solution.update(self.__find(board, {word}))
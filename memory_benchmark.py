@@ -0,0 +1,218 @@
+"""
+Memory benchmark of the solver.
+
+Measures the memory taken by loading the dictionary, building its index and
+solving fixed boards, and compares it with a saved baseline:
+
+    python memory_benchmark.py --save memory_baseline.json
+    python memory_benchmark.py --check memory_baseline.json --tolerance 10
+
+Every step reports the peak of the memory traced by tracemalloc and the
+peak growth of the resident set size (RSS) of the process, sampled in a
+background thread. The RSS includes what tracemalloc itself allocates, so
+only its changes are meaningful. --check exits with status 1 when a step
+grew by more than the tolerance.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from ex11_utils import find_length_n_paths, max_score_paths
+from lexicon import Lexicon
+
+# Boards solved by the benchmark, fixed so runs can be compared.
+BOARDS = [
+    [["S", "E", "R", "S"],
+     ["P", "A", "T", "G"],
+     ["L", "I", "N", "E"],
+     ["S", "E", "R", "S"]],
+    [["QU", "I", "T", "E"],
+     ["R", "A", "N", "D"],
+     ["O", "M", "L", "Y"],
+     ["B", "O", "G", "S"]],
+]
+PATH_LENGTH = 6
+
+RSS_SAMPLE_INTERVAL = 0.002
+# Steps taking less than this in the baseline are not compared, their
+# percentages are noise.
+MIN_COMPARED_BYTES = 1 << 20
+
+
+class StepMemory(NamedTuple):
+    """The memory taken by a step, in bytes."""
+
+    traced_peak: int
+    rss_peak: Optional[int]
+
+
+def current_rss() -> Optional[int]:
+    """Returns the resident set size of the process in bytes, None where it
+    can't be read (only Linux is supported)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def measure(step: Callable[[], object]) -> Tuple[object, StepMemory]:
+    """
+    Runs a step and measures its memory.
+    :param step: the function to run.
+    :return: the result of step, and its peak traced memory and peak RSS
+        growth over the memory held when it started.
+    """
+    start_rss = current_rss()
+    peak_rss = [start_rss]
+    done = threading.Event()
+
+    def sample() -> None:
+        while not done.wait(RSS_SAMPLE_INTERVAL):
+            rss = current_rss()
+            if rss is not None and rss > peak_rss[0]:
+                peak_rss[0] = rss
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    if start_rss is not None:
+        sampler.start()
+    tracemalloc.start()
+    try:
+        result = step()
+        _, traced_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        done.set()
+    if start_rss is None:
+        return result, StepMemory(traced_peak, None)
+    sampler.join()
+    end_rss = current_rss()
+    peak = max(peak_rss[0], end_rss if end_rss is not None else 0)
+    return result, StepMemory(traced_peak, peak - start_rss)
+
+
+def run_benchmark(dict_path: str) -> Dict[str, StepMemory]:
+    """
+    Measures every step of solving boards with a dictionary.
+    :param dict_path: path of the dictionary file, one word per line.
+    :return: dict from the name of every step to its memory.
+    """
+    results = {}
+
+    def load_words() -> List[str]:
+        with open(dict_path, "r") as f:
+            return f.read().split()
+
+    words, results["load_dictionary"] = measure(load_words)
+    lexicon, results["build_index"] = measure(lambda: Lexicon(words))
+    del words
+    _, results["find_length_n_paths"] = measure(
+        lambda: [find_length_n_paths(PATH_LENGTH, b, lexicon) for b in BOARDS]
+    )
+    _, results["max_score_paths"] = measure(
+        lambda: [max_score_paths(board, lexicon) for board in BOARDS]
+    )
+    return results
+
+
+def compare(
+    results: Dict[str, StepMemory],
+    baseline: Dict[str, StepMemory],
+    tolerance: float,
+    rss_tolerance: Optional[float] = None,
+) -> List[str]:
+    """
+    Compares measurements with a baseline.
+    :param results: the measurements, as run_benchmark returns them.
+    :param baseline: the measurements they are compared with.
+    :param tolerance: the percentage a traced peak may grow by.
+    :param rss_tolerance: the percentage an RSS peak may grow by, RSS is
+        not compared if None.
+    :return: a message for every step that grew by more than allowed.
+    """
+    failures = []
+    for step, memory in results.items():
+        if step not in baseline:
+            continue
+        checks = [("traced", memory.traced_peak,
+                   baseline[step].traced_peak, tolerance)]
+        if rss_tolerance is not None:
+            checks.append(("RSS", memory.rss_peak,
+                           baseline[step].rss_peak, rss_tolerance))
+        for name, value, limit, allowed in checks:
+            if value is None or limit is None or limit < MIN_COMPARED_BYTES:
+                continue
+            growth = (value - limit) * 100 / limit
+            if growth > allowed:
+                failures.append(
+                    f"{step}: {name} peak {value / 2**20:.1f} MiB is"
+                    f" {growth:.1f}% over the baseline"
+                    f" {limit / 2**20:.1f} MiB (allowed {allowed}%)"
+                )
+    return failures
+
+
+def save_results(path: str, results: Dict[str, StepMemory]) -> None:
+    """Writes measurements to a JSON baseline file."""
+    with open(path, "w") as f:
+        json.dump(
+            {step: memory._asdict() for step, memory in results.items()},
+            f,
+            indent=2,
+        )
+        f.write("\n")
+
+
+def load_results(path: str) -> Dict[str, StepMemory]:
+    """Reads measurements from a JSON baseline file."""
+    with open(path, "r") as f:
+        return {
+            step: StepMemory(**memory) for step, memory in json.load(f).items()
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure the memory of loading and solving."
+    )
+    parser.add_argument("--dict", default="boggle_dict.txt")
+    parser.add_argument("--save", help="write the results as a baseline")
+    parser.add_argument("--check", help="compare with a baseline file")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=10.0,
+        help="allowed growth of the traced peaks in percent",
+    )
+    parser.add_argument(
+        "--rss-tolerance",
+        type=float,
+        help="allowed growth of the RSS peaks in percent, not checked"
+        " by default since RSS depends on the host",
+    )
+    args = parser.parse_args()
+
+    results = run_benchmark(args.dict)
+    for step, memory in results.items():
+        rss = "n/a" if memory.rss_peak is None \
+            else f"{memory.rss_peak / 2**20:.1f} MiB"
+        print(
+            f"{step:<20} traced peak {memory.traced_peak / 2**20:8.1f} MiB,"
+            f" RSS growth {rss}"
+        )
+    if args.save:
+        save_results(args.save, results)
+    if args.check:
+        failures = compare(
+            results,
+            load_results(args.check),
+            args.tolerance,
+            args.rss_tolerance,
+        )
+        for failure in failures:
+            print(failure, file=sys.stderr)
+        sys.exit(1 if failures else 0)
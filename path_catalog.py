@@ -0,0 +1,328 @@
+"""
+Catalogs of the legal paths of a board shape.
+
+Which paths are legal on a board only depends on its shape, not on its
+letters. A PathCatalog enumerates once every path of a shape up to a length
+and stores them compactly, grouped by prefix: level L holds the last cell
+of every path of L tiles, and the paths extending a path of level L are
+consecutive on level L + 1, so a path is found from its prefix with two
+offsets. Solving a board then walks the catalog and the trie together,
+without checking adjacency or visited tiles:
+
+    python path_catalog.py 4 4 --max-length 8 4x4.paths
+
+Saved catalogs are memory mapped, so loading one is immediate and the
+processes mapping the same file share its pages.
+"""
+import argparse
+import mmap
+import struct
+from array import array
+from bisect import bisect_right
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from board_encoding import BLANK_LETTERS, EncodedBoard, neighbour_moves
+from lexicon import ROOT, Lexicon
+
+Board = List[List[str]]
+Path = List[Tuple[int, int]]
+
+CATALOG_MAGIC = b"BGPTH\x01"
+# rows, cols, max_length, then the number of paths of every length.
+HEADER = struct.Struct("<III")
+COUNT = struct.Struct("<I")
+# Shapes with up to this many tiles store one byte per cell, bigger shapes
+# store two.
+MAX_BYTE_TILES = 256
+
+
+class PathCatalog:
+    """
+    Every legal path of a board shape, up to a maximal length.
+    cells(L) holds the last cell of every path of L tiles, and the paths of
+    L + 1 tiles extending path i of L tiles are first(L)[i] to
+    first(L)[i + 1]. Paths of a length are in the order of a depth first
+    search, so solving a board finds them in the order find_length_n_paths
+    does.
+    """
+
+    def __init__(
+        self,
+        rows: int,
+        cols: int,
+        cells: Sequence[Sequence[int]],
+        first: Sequence[Sequence[int]],
+        source: Optional[mmap.mmap] = None,
+    ):
+        """Creates a catalog from its arrays, use build or load instead.
+        :param cells: the cells of every level, from paths of 1 tile.
+        :param first: the offsets of the extensions of every level but the
+            last.
+        :param source: the mapped file the arrays are views of, if any."""
+        self.__rows = rows
+        self.__cols = cols
+        self.__cells = list(cells)
+        self.__first = list(first)
+        self.__source = source
+
+    @staticmethod
+    def __aligned(offset: int) -> int:
+        """Returns offset rounded up to a multiple of 4 bytes, so the
+        arrays of a mapped file can be viewed as arrays of ints."""
+        return (offset + 3) & ~3
+
+    @classmethod
+    def build(cls, rows: int, cols: int, max_length: int) -> "PathCatalog":
+        """
+        Enumerates the legal paths of a board shape.
+        :param rows: number of rows of the board.
+        :param cols: number of columns of the board.
+        :param max_length: the number of tiles of the longest paths kept.
+        :return: the catalog.
+        """
+        code = "B" if rows * cols <= MAX_BYTE_TILES else "H"
+        moves = neighbour_moves(rows, cols)
+        level_cells = array(code, range(rows * cols))
+        visited = [1 << cell for cell in level_cells]
+        cells = [level_cells]
+        first = []
+        for _ in range(1, max_length):
+            next_cells = array(code)
+            next_visited = []
+            offsets = array("I", [0])
+            for cell, mask in zip(level_cells, visited):
+                for new_cell, bit in moves[cell]:
+                    if not mask & bit:
+                        next_cells.append(new_cell)
+                        next_visited.append(mask | bit)
+                offsets.append(len(next_cells))
+            if not next_cells:
+                break
+            first.append(offsets)
+            cells.append(next_cells)
+            level_cells, visited = next_cells, next_visited
+        return cls(rows, cols, cells, first)
+
+    def save(self, path: str) -> None:
+        """Writes the catalog to a file, in the byte order of the machine.
+        :param path: path of the catalog file."""
+        with open(path, "wb") as f:
+            f.write(CATALOG_MAGIC)
+            f.write(HEADER.pack(self.__rows, self.__cols, self.max_length))
+            for level_cells in self.__cells:
+                f.write(COUNT.pack(len(level_cells)))
+            for values in self.__cells + self.__first:
+                f.write(b"\0" * (self.__aligned(f.tell()) - f.tell()))
+                f.write(array(values.typecode, values).tobytes())
+
+    @classmethod
+    def load(cls, path: str) -> "PathCatalog":
+        """Maps a catalog file written by save.
+        :param path: path of the catalog file.
+        :return: the catalog, whose arrays are views of the mapped file."""
+        with open(path, "rb") as f:
+            source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if source[:len(CATALOG_MAGIC)] != CATALOG_MAGIC:
+            source.close()
+            raise ValueError(f"{path} is not a path catalog")
+        offset = len(CATALOG_MAGIC)
+        rows, cols, max_length = HEADER.unpack_from(source, offset)
+        offset += HEADER.size
+        counts = [
+            COUNT.unpack_from(source, offset + COUNT.size * level)[0]
+            for level in range(max_length)
+        ]
+        offset += COUNT.size * max_length
+        view = memoryview(source)
+        code = "B" if rows * cols <= MAX_BYTE_TILES else "H"
+
+        def take(typecode: str, count: int) -> memoryview:
+            nonlocal offset
+            offset = cls.__aligned(offset)
+            size = array(typecode).itemsize * count
+            values = view[offset:offset + size].cast(typecode)
+            offset += size
+            return values
+
+        cells = [take(code, count) for count in counts]
+        first = [take("I", count + 1) for count in counts[:-1]]
+        return cls(rows, cols, cells, first, source)
+
+    def close(self) -> None:
+        """Unmaps the file of a loaded catalog."""
+        if self.__source is not None:
+            self.__cells = self.__first = []
+            self.__source.close()
+            self.__source = None
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """The (rows, columns) of the boards of the catalog."""
+        return self.__rows, self.__cols
+
+    @property
+    def max_length(self) -> int:
+        """The number of tiles of the longest paths in the catalog."""
+        return len(self.__cells)
+
+    def count(self, length: int) -> int:
+        """Returns the number of legal paths of length tiles."""
+        if not 1 <= length <= self.max_length:
+            return 0
+        return len(self.__cells[length - 1])
+
+    def path(self, length: int, index: int) -> Path:
+        """Returns path number index of length tiles."""
+        cells = []
+        for level in range(length - 1, -1, -1):
+            cells.append(self.__cells[level][index])
+            if level:
+                index = bisect_right(self.__first[level - 1], index) - 1
+        cols = self.__cols
+        return [divmod(cell, cols) for cell in reversed(cells)]
+
+    def paths(self, length: int) -> Iterator[Path]:
+        """Iterates over the legal paths of length tiles."""
+        for index in range(self.count(length)):
+            yield self.path(length, index)
+
+    def __search(
+        self, n: int, board: Board, words: Iterable[str]
+    ) -> List[Tuple[int, int]]:
+        """Finds the paths of n tiles forming a word, as the indices of the
+        paths on level n and the trie nodes of their words."""
+        if (len(board), len(board[0]) if board else 0) != self.shape:
+            raise ValueError(
+                f"the board is not {self.__rows}x{self.__cols}"
+            )
+        lexicon = words if hasattr(words, "tables") else Lexicon(words)
+        base, check, counts, terminal = lexicon.tables()
+        letters = EncodedBoard(board, lexicon.alphabet).letters
+
+        # A partial word is only kept if the words below it can be
+        # completed with the tiles that are left, as in __search_board.
+        shortest = longest = None
+        if lexicon.exact:
+            shortest, longest = lexicon.completion_lengths()
+            tile_sizes = [len(tile_letters) for tile_letters in letters]
+            fewest = min(tile_sizes, default=1)
+            most = max(tile_sizes, default=1)
+
+        def step(node: int, cell: int) -> Sequence[int]:
+            """Returns the nodes reached by spelling the tile of a cell."""
+            if letters[cell] is BLANK_LETTERS:
+                return lexicon.children(node)
+            for letter in letters[cell]:
+                child = base[node] + letter
+                if check[child] != node:
+                    return ()
+                node = child
+            return (node,)
+
+        def live(node: int, left: int) -> bool:
+            if not counts[node]:
+                return False
+            return shortest is None or (
+                shortest[node] <= left * most
+                and longest[node] >= left * fewest
+            )
+
+        # The letter of every cell holding a single letter, the trie is
+        # walked inline for them.
+        single = [
+            tile_letters[0]
+            if len(tile_letters) == 1 and tile_letters is not BLANK_LETTERS
+            else None
+            for tile_letters in letters
+        ]
+        frontier = [
+            (cell, node)
+            for cell in range(len(letters))
+            for node in step(ROOT, cell)
+            if live(node, n - 1)
+        ]
+        for level in range(1, n):
+            first = self.__first[level - 1]
+            level_cells = self.__cells[level]
+            left = n - 1 - level
+            next_frontier = []
+            append = next_frontier.append
+            for index, node in frontier:
+                first_child = base[node]
+                for child_index in range(first[index], first[index + 1]):
+                    cell = level_cells[child_index]
+                    letter = single[cell]
+                    if letter is None:
+                        for child in step(node, cell):
+                            if live(child, left):
+                                append((child_index, child))
+                        continue
+                    child = first_child + letter
+                    if check[child] != node or not counts[child]:
+                        continue
+                    if shortest is None or (
+                        shortest[child] <= left * most
+                        and longest[child] >= left * fewest
+                    ):
+                        append((child_index, child))
+            frontier = next_frontier
+        return [(index, node) for index, node in frontier if terminal[node]]
+
+    def count_length_n_paths(
+        self, n: int, board: Board, words: Iterable[str]
+    ) -> int:
+        """
+        Counts the paths of n tiles forming a word on a board of the shape,
+        like ex11_utils.count_length_n_paths.
+        :param n: the length of the paths, at most max_length.
+        :param board: two dimensional list of strings representing the board.
+        :param words: the words that can be formed, preferably a Lexicon.
+        :return: the number of paths.
+        """
+        self.__check_length(n)
+        if n <= 0:
+            return 0
+        return len(self.__search(n, board, words))
+
+    def find_length_n_paths(
+        self, n: int, board: Board, words: Iterable[str]
+    ) -> List[Path]:
+        """
+        Finds the paths of n tiles forming a word on a board of the shape,
+        in the order of ex11_utils.find_length_n_paths on boards without
+        blank tiles.
+        :param n: the length of the paths, at most max_length.
+        :param board: two dimensional list of strings representing the board.
+        :param words: the words that can be formed, preferably a Lexicon.
+        :return: list of the paths.
+        """
+        self.__check_length(n)
+        if n <= 0:
+            return []
+        return [self.path(n, index) for index, _ in self.__search(
+            n, board, words
+        )]
+
+    def __check_length(self, n: int) -> None:
+        """Raises ValueError for paths longer than the catalog holds."""
+        if n > self.max_length:
+            raise ValueError(
+                f"the catalog holds paths of up to {self.max_length} tiles,"
+                f" not {n}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build the catalog of the legal paths of a board shape."
+    )
+    parser.add_argument("rows", type=int)
+    parser.add_argument("cols", type=int)
+    parser.add_argument("catalog", help="path of the catalog file")
+    parser.add_argument("--max-length", type=int, default=8)
+    args = parser.parse_args()
+
+    catalog = PathCatalog.build(args.rows, args.cols, args.max_length)
+    catalog.save(args.catalog)
+    for length in range(1, catalog.max_length + 1):
+        print(f"{length:>3} tiles: {catalog.count(length)} paths")
@@ -0,0 +1,177 @@
+import argparse
+from multiprocessing import Pool
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from board_encoding import neighbour_masks
+from event_log import (
+    ADD_WORD,
+    CLICK_TILE,
+    NEW_GAME,
+    READ_CHUNK_SIZE,
+    SET_PATH,
+    Event,
+    read_events,
+)
+from ex11_utils import validate_paths, word_score
+from lexicon import Lexicon
+
+
+class GameReplay(NamedTuple):
+    """The outcome of a replayed game."""
+
+    board: List[List[str]]
+    words: List[str]
+    score: int
+    submissions: int
+
+
+class LogSummary(NamedTuple):
+    """The totals of all the games of a log."""
+
+    games: int
+    submissions: int
+    accepted: int
+    score: int
+
+
+def __finish_game(
+    board: List[List[str]], submissions: List[List[int]], words: Iterable[str]
+) -> GameReplay:
+    """Scores the submissions of a game the way Boggle does.
+    :param board: the board of the game.
+    :param submissions: the cells of the path of every add_word event.
+    :param words: the words that are accepted in the game.
+    :return: the replayed game."""
+    found = []
+    score = 0
+    for word in validate_paths(board, submissions, words):
+        if word and word not in found:
+            found.append(word)
+            score += word_score(word)
+    return GameReplay(board, found, score, len(submissions))
+
+
+def replay_events(
+    events: Iterable[Event], words: Iterable[str]
+) -> Iterator[GameReplay]:
+    """
+    Replays a stream of events, yielding every game once it ends.
+    Clicks are accepted with the rules of is_valid_partial_path, a typed
+    path replaces the current path as if its tiles were clicked one by one,
+    and the submitted paths are checked with validate_paths, so only the
+    game being replayed is held in memory.
+    :param events: the events, as read by event_log.read_events.
+    :param words: the words that are accepted in the game.
+    :return: iterator of the replayed games.
+    """
+    board = None
+    submissions = []
+    path = []
+    visited = 0
+    cols = 0
+    masks = ()
+    for event_type, _, data in events:
+        if event_type == NEW_GAME:
+            if board is not None:
+                yield __finish_game(board, submissions, words)
+            board, submissions, path, visited = data, [], [], 0
+            cols = len(board[0])
+            masks = neighbour_masks(len(board), cols)
+        elif board is None:
+            continue
+        elif event_type in (CLICK_TILE, SET_PATH):
+            tiles = [data]
+            if event_type == SET_PATH:
+                tiles = data
+                path, visited = [], 0
+            for y, x in tiles:
+                if not (0 <= y < len(board) and 0 <= x < cols):
+                    continue
+                cell = y * cols + x
+                bit = 1 << cell
+                if visited & bit or path and not masks[path[-1]] & bit:
+                    continue
+                path.append(cell)
+                visited |= bit
+        elif event_type == ADD_WORD:
+            submissions.append(path)
+            path, visited = [], 0
+    if board is not None:
+        yield __finish_game(board, submissions, words)
+
+
+def replay_log(
+    path: str, words: Iterable[str], chunk_size: int = READ_CHUNK_SIZE
+) -> Iterator[GameReplay]:
+    """Replays the games of a log file, streaming it in chunks.
+    :param path: path of the log.
+    :param words: the words that are accepted in the game.
+    :param chunk_size: number of bytes read at a time.
+    :return: iterator of the replayed games."""
+    with open(path, "rb") as f:
+        yield from replay_events(read_events(f, chunk_size), words)
+
+
+def summarize_log(
+    path: str, words: Iterable[str], chunk_size: int = READ_CHUNK_SIZE
+) -> LogSummary:
+    """Replays a log file and returns its totals."""
+    games = submissions = accepted = score = 0
+    for game in replay_log(path, words, chunk_size):
+        games += 1
+        submissions += game.submissions
+        accepted += len(game.words)
+        score += game.score
+    return LogSummary(games, submissions, accepted, score)
+
+
+# The words of the worker processes, loaded once per process.
+_worker_words: Optional[Lexicon] = None
+
+
+def _load_worker_words(dict_path: str) -> None:
+    """Initializes a worker process with the words of a dictionary file."""
+    global _worker_words
+    with open(dict_path, "r") as f:
+        _worker_words = Lexicon(f.read().split())
+
+
+def _summarize_in_worker(path: str) -> LogSummary:
+    """Summarizes a log with the words of the worker process."""
+    return summarize_log(path, _worker_words)
+
+
+def summarize_logs(
+    paths: List[str], dict_path: str, processes: int = 1
+) -> Dict[str, LogSummary]:
+    """
+    Replays many log files, optionally in parallel processes.
+    Every log is streamed by a single process, so memory stays bounded by
+    one chunk and one game per process.
+    :param paths: paths of the logs.
+    :param dict_path: path of the dictionary file of the games.
+    :param processes: number of processes to use.
+    :return: dict from every log path to its totals.
+    """
+    if processes <= 1:
+        _load_worker_words(dict_path)
+        return {path: _summarize_in_worker(path) for path in paths}
+    with Pool(processes, _load_worker_words, (dict_path,)) as pool:
+        return dict(zip(paths, pool.map(_summarize_in_worker, paths)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Re-validate and re-score recorded Boggle games."
+    )
+    parser.add_argument("logs", nargs="+", help="event log files")
+    parser.add_argument("--dict", default="boggle_dict.txt")
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args()
+
+    summaries = summarize_logs(args.logs, args.dict, args.processes)
+    for log, summary in summaries.items():
+        print(
+            f"{log}: {summary.games} games, {summary.submissions} submissions,"
+            f" {summary.accepted} accepted, score {summary.score}"
+        )
@@ -0,0 +1,232 @@
+import argparse
+import json
+import sqlite3
+from typing import Iterable, List, Optional, Tuple
+
+from boggle_solve import load_lexicon
+from ex11_utils import Board, Path, max_score_words, word_score
+from lexicon import Lexicon
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS boards (
+    id INTEGER PRIMARY KEY,
+    board TEXT NOT NULL UNIQUE,
+    score INTEGER NOT NULL,
+    word_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS words (
+    board_id INTEGER NOT NULL REFERENCES boards(id) ON DELETE CASCADE,
+    word TEXT NOT NULL,
+    path TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    PRIMARY KEY (board_id, word)
+);
+CREATE INDEX IF NOT EXISTS boards_score_idx ON boards(score);
+CREATE INDEX IF NOT EXISTS words_word_idx ON words(word);
+CREATE INDEX IF NOT EXISTS words_board_score_idx ON words(board_id, score);
+"""
+
+
+def _encode_board(board: Board) -> str:
+    """Returns the canonical text form of a board used as its key."""
+    return json.dumps(board, separators=(",", ":"))
+
+
+def _decode_path(text: str) -> Path:
+    """Returns the path stored in the given text."""
+    return [(x, y) for x, y in json.loads(text)]
+
+
+class SolutionDatabase:
+    """
+    A local SQLite store of solved boards.
+    Every board is solved once with max_score_words and its words, paths
+    and scores are stored, so questions about a corpus of boards are
+    answered by indexed queries instead of solving the boards again.
+    """
+
+    def __init__(self, db_path: str = ":memory:"):
+        """Opens (and creates if needed) the database at the given path.
+        :param db_path: path of the SQLite file, in memory by default."""
+        self.__connection = sqlite3.connect(db_path)
+        self.__connection.execute("PRAGMA foreign_keys = ON")
+        self.__connection.executescript(SCHEMA)
+        self.__connection.commit()
+
+    def __enter__(self) -> "SolutionDatabase":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the connection to the database."""
+        self.__connection.close()
+
+    def __contains__(self, board: Board) -> bool:
+        return self.__board_id(board) is not None
+
+    def __len__(self) -> int:
+        return self.__connection.execute(
+            "SELECT COUNT(*) FROM boards"
+        ).fetchone()[0]
+
+    def __board_id(self, board: Board) -> Optional[int]:
+        """Returns the id of a stored board, None if it is not stored."""
+        row = self.__connection.execute(
+            "SELECT id FROM boards WHERE board = ?", (_encode_board(board),)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def add_solutions(
+        self, solutions: Iterable[Tuple[Board, List[Tuple[str, Path]]]]
+    ) -> int:
+        """
+        Stores already solved boards in a single transaction.
+        Boards that are already stored are skipped.
+        :param solutions: pairs of a board and its max_score_words result.
+        :return: the number of boards that were added.
+        """
+        added = 0
+        with self.__connection:
+            for board, found in solutions:
+                words = {}
+                for word, path in found:
+                    words[word] = (json.dumps(path), word_score(word))
+                cursor = self.__connection.execute(
+                    "INSERT OR IGNORE INTO boards (board, score, word_count)"
+                    " VALUES (?, ?, ?)",
+                    (
+                        _encode_board(board),
+                        sum(score for _, score in words.values()),
+                        len(words),
+                    ),
+                )
+                if cursor.rowcount == 0:
+                    continue
+                board_id = cursor.lastrowid
+                self.__connection.executemany(
+                    "INSERT INTO words (board_id, word, path, score)"
+                    " VALUES (?, ?, ?, ?)",
+                    [
+                        (board_id, word, path, score)
+                        for word, (path, score) in words.items()
+                    ],
+                )
+                added += 1
+        return added
+
+    def solve_corpus(
+        self,
+        boards: Iterable[Board],
+        words: Iterable[str],
+        batch_size: int = 256,
+    ) -> int:
+        """
+        Solves every board that is not stored yet and stores the results.
+        The results are inserted in transactions of batch_size boards.
+        :param boards: the boards to solve.
+        :param words: the words that can be formed, preferably a Lexicon.
+            Other collections are turned into one Lexicon shared by all the
+            boards.
+        :param batch_size: number of boards per transaction.
+        :return: the number of boards that were added.
+        """
+        if not isinstance(words, Lexicon):
+            words = Lexicon(words)
+        added = 0
+        batch = []
+        for board in boards:
+            if board in self:
+                continue
+            batch.append((board, max_score_words(board, words)))
+            if len(batch) >= batch_size:
+                added += self.add_solutions(batch)
+                batch = []
+        if batch:
+            added += self.add_solutions(batch)
+        return added
+
+    def board_score(self, board: Board) -> Optional[int]:
+        """Returns the total score of a stored board, None if not stored."""
+        row = self.__connection.execute(
+            "SELECT score FROM boards WHERE board = ?",
+            (_encode_board(board),),
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def board_words(self, board: Board) -> List[Tuple[str, Path, int]]:
+        """
+        Returns the stored words of a board, highest score first.
+        :param board: the board.
+        :return: list of (word, path, score) tuples.
+        """
+        rows = self.__connection.execute(
+            "SELECT word, path, words.score FROM words"
+            " JOIN boards ON boards.id = words.board_id"
+            " WHERE boards.board = ? ORDER BY words.score DESC, word",
+            (_encode_board(board),),
+        )
+        return [
+            (word, _decode_path(path), score) for word, path, score in rows
+        ]
+
+    def boards_containing(self, word: str) -> List[Board]:
+        """Returns all stored boards on which the given word can be formed."""
+        rows = self.__connection.execute(
+            "SELECT boards.board FROM words"
+            " JOIN boards ON boards.id = words.board_id"
+            " WHERE words.word = ? ORDER BY boards.id",
+            (word,),
+        )
+        return [json.loads(board) for board, in rows]
+
+    def boards_with_score_above(self, score: int) -> List[Tuple[Board, int]]:
+        """
+        Returns the stored boards whose total score is greater than score.
+        :param score: the minimal (exclusive) score.
+        :return: list of (board, score) tuples, highest score first.
+        """
+        rows = self.__connection.execute(
+            "SELECT board, score FROM boards WHERE score > ?"
+            " ORDER BY score DESC, id",
+            (score,),
+        )
+        return [(json.loads(board), total) for board, total in rows]
+
+    def best_word_per_board(self) -> List[Tuple[Board, str, Path, int]]:
+        """
+        Returns the highest scoring word of every stored board.
+        Ties are broken alphabetically, boards without words are omitted.
+        :return: list of (board, word, path, score) tuples.
+        """
+        rows = self.__connection.execute(
+            "SELECT boards.board, words.word, words.path, words.score"
+            " FROM boards JOIN words ON words.board_id = boards.id"
+            " WHERE words.word = ("
+            "   SELECT best.word FROM words AS best"
+            "   WHERE best.board_id = boards.id"
+            "   ORDER BY best.score DESC, best.word LIMIT 1"
+            " ) ORDER BY boards.id"
+        )
+        return [
+            (json.loads(board), word, _decode_path(path), score)
+            for board, word, path, score in rows
+        ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Solve a corpus of boards into a SQLite database."
+    )
+    parser.add_argument("database", help="path of the SQLite file")
+    parser.add_argument(
+        "boards", help="file with one board per line, as a JSON list of rows"
+    )
+    parser.add_argument("--dict", default="boggle_dict.txt")
+    args = parser.parse_args()
+
+    valid_words = load_lexicon(args.dict)
+    with open(args.boards, "r") as f, SolutionDatabase(args.database) as db:
+        corpus = (json.loads(line) for line in f if line.strip())
+        print(f"Added {db.solve_corpus(corpus, valid_words)} boards.")
@@ -0,0 +1,73 @@
+import time
+
+from async_solver import BackgroundSolver
+from ex11_utils import max_score_paths
+from lexicon import Lexicon
+
+
+class FakeMainloop:
+    """Runs scheduled callbacks in order, like Tk.after without waiting."""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, delay_ms, callback):
+        self.pending.append(callback)
+
+    def run(self, timeout=5.0):
+        end = time.monotonic() + timeout
+        while self.pending and time.monotonic() < end:
+            self.pending.pop(0)()
+            time.sleep(0.001)
+
+
+class TestBackgroundSolver:
+    board = [
+        ["Q", "A", "B", "C"],
+        ["U", "I", "T", "E"],
+        ["C", "A", "T", "S"],
+        ["D", "O", "G", "S"],
+    ]
+    words = Lexicon(["QUIT", "QUITE", "CAT", "CATS", "DOG", "DOGS", "BITE"])
+
+    def test_result_delivered_on_mainloop(self):
+        solver = BackgroundSolver()
+        loop = FakeMainloop()
+        results, progress = [], []
+        solver.solve(
+            self.board,
+            self.words,
+            loop.after,
+            lambda paths, complete: results.append((paths, complete)),
+            lambda searched, total: progress.append((searched, total)),
+        )
+        loop.run()
+        solver.shutdown()
+
+        assert len(results) == 1
+        paths, complete = results[0]
+        assert complete
+        expected = max_score_paths(self.board, self.words, "one_path_per_word")
+        assert sum(map(len, paths)) == sum(map(len, expected))
+        assert progress and progress[-1][0] == progress[-1][1]
+
+    def test_cancelled_solve_never_calls_back(self):
+        solver = BackgroundSolver()
+        loop = FakeMainloop()
+        results = []
+        handle = solver.solve(
+            self.board,
+            self.words,
+            loop.after,
+            lambda *result: results.append(result),
+        )
+        handle.cancel()
+        loop.run()
+        # The worker stops at its next check, or never starts.
+        time.sleep(0.1)
+        assert handle.done()
+        solver.shutdown()
+
+        assert handle.cancelled()
+        assert results == []
+        assert loop.pending == []
@@ -0,0 +1,44 @@
+import random
+
+from batch_solver import batch_max_score_paths
+from ex11_utils import max_score_paths
+from lexicon import Lexicon
+
+
+WORDS = ['CAT', 'CATS', 'DOG', 'DOGS', 'BIT', 'BITS', 'COD', 'TOGA', 'GOAT',
+         'QUIT', 'QUITS', 'SIT', 'ZOO', 'A', 'AT', 'TO', 'TOT', 'TOTS']
+TILES = ['C', 'A', 'T', 'S', 'D', 'O', 'G', 'B', 'I', 'QU', 'Z', '?']
+
+
+def canonical(board, paths):
+    if any('?' in row for row in board):
+        # The tiles of a path don't tell which word a blank spelled.
+        return sorted(len(path) for path in paths)
+    return sorted(("".join(board[x][y] for x, y in path), len(path))
+                  for path in paths)
+
+
+class TestBatchMaxScorePaths:
+    def test_same_as_max_score_paths(self):
+        rng = random.Random(3)
+        lexicon = Lexicon(WORDS)
+        boards = []
+        for _ in range(100):
+            rows, cols = rng.randint(1, 4), rng.randint(1, 4)
+            boards.append([[rng.choice(TILES) for _ in range(cols)]
+                           for _ in range(rows)])
+        for batch_size in (1, 7, 100):
+            results = batch_max_score_paths(boards, lexicon, batch_size)
+            assert len(results) == len(boards)
+            for board, paths in zip(boards, results):
+                expected = max_score_paths(board, lexicon)
+                assert canonical(board, paths) == canonical(board, expected)
+                assert [len(p) for p in paths] == \
+                    sorted((len(p) for p in paths), reverse=True)
+
+    def test_plain_words_and_no_boards(self):
+        board = [['C', 'A'], ['S', 'T']]
+        [paths] = batch_max_score_paths([board], set(WORDS))
+        assert canonical(board, paths) == [('A', 1), ('AT', 2), ('CAT', 3),
+                                           ('CATS', 4)]
+        assert batch_max_score_paths([], WORDS) == []
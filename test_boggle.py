@@ -0,0 +1,52 @@
+import time
+
+import boggle
+
+
+class RecordingGUI:
+    """Stands for the GUI of a game, running scheduled callbacks when asked
+    and recording the best scores shown."""
+
+    def __init__(self, controller, board, instrumentation):
+        self.pending = []
+        self.best_scores = []
+
+    def schedule(self, delay_ms, callback):
+        self.pending.append(callback)
+
+    def run(self, timeout=5.0):
+        end = time.monotonic() + timeout
+        while self.pending and time.monotonic() < end:
+            self.pending.pop(0)()
+            time.sleep(0.001)
+
+    def update_best_score(self, text):
+        self.best_scores.append(text)
+
+    def __getattr__(self, name):
+        return lambda *args: None
+
+
+def start_game(monkeypatch, board, words, **options):
+    monkeypatch.setattr(boggle, "GUI", RecordingGUI)
+    monkeypatch.setattr(boggle, "randomize_board", lambda: board)
+    game = boggle.Boggle(words, **options)
+    game._Boggle__setup_game()
+    game.event_from_gui("game_started", None)
+    return game, game._Boggle__gui
+
+
+class TestBestScore:
+
+    def test_scored_like_submitted_words(self, monkeypatch):
+        game, gui = start_game(monkeypatch, [['QU', 'I', 'T'],
+                                             ['C', 'A', 'T']],
+                               ['QUIT', 'CAT'], show_best_score=True)
+        gui.run()
+        # QUIT takes 3 tiles but scores its 4 letters, like when submitted.
+        assert gui.best_scores[-1] == f"Best: {4 ** 2 + 3 ** 2}"
+        game._Boggle__solver.shutdown()
+
+    def test_off_by_default(self, monkeypatch):
+        game, gui = start_game(monkeypatch, [['C', 'A', 'T']], ['CAT'])
+        assert gui.best_scores == [] and gui.pending == []
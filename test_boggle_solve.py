@@ -0,0 +1,125 @@
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from boggle_solve import load_lexicon, solve_stream
+from ex11_utils import WORDS_ONLY
+from lexicon import Lexicon
+
+
+BOARD = [['C', 'A', 'T'], ['D', 'O', 'G'], ['B', 'I', 'T']]
+BLANK_BOARD = [['C', '?', 'T'], ['Q', 'Q', 'Q']]
+
+
+@pytest.fixture
+def dict_path(tmp_path):
+    path = tmp_path / "dict.txt"
+    path.write_text("CAT\nCUT\nDOG\nCOD\n")
+    return str(path)
+
+
+class TestLoadLexicon:
+
+    def test_builds_then_loads_index(self, dict_path):
+        assert not os.path.exists(dict_path + ".idx")
+        assert sorted(load_lexicon(dict_path)) == ['CAT', 'COD', 'CUT',
+                                                   'DOG']
+        assert os.path.exists(dict_path + ".idx")
+        # The index is read instead of the dictionary while it is newer.
+        Lexicon(['ZOO']).save(dict_path + ".idx")
+        assert sorted(load_lexicon(dict_path)) == ['ZOO']
+
+    def test_rebuilds_stale_or_unreadable_index(self, dict_path, tmp_path):
+        index_path = str(tmp_path / "other.idx")
+        Lexicon(['ZOO']).save(index_path)
+        os.utime(index_path, (0, 0))
+        assert 'ZOO' not in load_lexicon(dict_path, index_path)
+        with open(index_path, "wb") as f:
+            f.write(b"not an index")
+        assert len(load_lexicon(dict_path, index_path)) == 4
+
+
+class TestSolveStream:
+
+    def test_boards_and_blank_lines(self, dict_path):
+        lines = io.StringIO("\n" + json.dumps(BOARD) + "\n\n"
+                            + json.dumps(BOARD) + "\n")
+        output = io.StringIO()
+        assert solve_stream(lines, output, dict_path) == 2
+        records = [json.loads(line)
+                   for line in output.getvalue().splitlines()]
+        assert len(records) == 2 and records[0] == records[1]
+        assert records[0]["board"] == BOARD
+        assert sorted(word["word"] for word in records[0]["words"]) == \
+               ['CAT', 'COD', 'DOG']
+        assert records[0]["score"] == 27
+
+    def test_words_only(self, dict_path):
+        output = io.StringIO()
+        solve_stream(io.StringIO(json.dumps(BOARD)), output, dict_path,
+                     mode=WORDS_ONLY)
+        assert sorted(json.loads(output.getvalue())["words"]) == \
+               ['CAT', 'COD', 'DOG']
+
+    def test_no_boards_loads_nothing(self, dict_path):
+        output = io.StringIO()
+        assert solve_stream(io.StringIO("\n \n"), output, dict_path) == 0
+        assert output.getvalue() == ""
+        assert not os.path.exists(dict_path + ".idx")
+
+    def test_blank_tiles(self, dict_path):
+        output = io.StringIO()
+        assert solve_stream(io.StringIO(json.dumps(BLANK_BOARD) + "\n"),
+                            output, dict_path) == 1
+        record = json.loads(output.getvalue())
+        path = [[0, 0], [0, 1], [0, 2]]
+        assert sorted(record["words"], key=lambda word: word["word"]) == \
+               [{"word": "CAT", "path": path, "score": 9},
+                {"word": "CUT", "path": path, "score": 9}]
+        assert record["score"] == 18
+
+    def test_tiles_scored_by_letters(self, tmp_path):
+        path = tmp_path / "dict.txt"
+        path.write_text("QUIT\n")
+        output = io.StringIO()
+        solve_stream(io.StringIO(json.dumps([['QU', 'I', 'T']])), output,
+                     str(path))
+        # Like in the game, QUIT scores its 4 letters and not its 3 tiles.
+        assert json.loads(output.getvalue())["score"] == 16
+
+
+class TestCommandLine:
+
+    def run(self, args, stdin):
+        return subprocess.run(
+            [sys.executable, "boggle_solve.py"] + args,
+            input=stdin, capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+
+    def test_stdin_to_stdout(self, dict_path):
+        result = self.run(["--dict", dict_path, "--mode", WORDS_ONLY],
+                          json.dumps(BLANK_BOARD) + "\n\n")
+        [line] = result.stdout.splitlines()
+        assert sorted(json.loads(line)["words"]) == ['CAT', 'CUT']
+        assert result.stderr == ""
+
+    def test_timing_without_boards(self, dict_path):
+        result = self.run(["--dict", dict_path, "--timing"], "")
+        assert result.stdout == ""
+        assert "startup:" in result.stderr
+        assert "solved 0 boards" in result.stderr
+
+    def test_reference_engine_not_imported(self):
+        result = subprocess.run(
+            [sys.executable, "-c",
+             "import sys, boggle_solve;"
+             " print('reference_engine' in sys.modules)"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        assert result.stdout.strip() == "False"
@@ -0,0 +1,58 @@
+import math
+from collections import Counter
+
+import pytest
+
+from dice_analytics import (
+    DiceStats,
+    analyze_dice,
+    format_report,
+    mean_interval,
+    percentile,
+    wilson_interval,
+)
+
+DICE = [['C', 'A', 'T', 'D', 'O', 'G']] * 16
+WORDS = ['CAT', 'DOG', 'GOAT', 'TOGA', 'COD', 'ACT', 'TAG', 'DOT']
+
+
+def write_dict(tmp_path):
+    path = tmp_path / "words.txt"
+    path.write_text("\n".join(WORDS))
+    return str(path)
+
+
+class TestDiceAnalytics:
+    def test_same_result_in_parallel(self, tmp_path):
+        dict_path = write_dict(tmp_path)
+        one = analyze_dice(DICE, 50, dict_path, seed=3, batch_boards=8)
+        two = analyze_dice(DICE, 50, dict_path, processes=2, seed=3,
+                           batch_boards=8)
+        assert one.boards == two.boards == 50
+        assert one.word_counts == two.word_counts
+        assert one.scores == two.scores
+        assert one.face_words == two.face_words
+        assert sum(one.faces_seen.values()) == 50 * 16
+        assert one.dead_boards == one.word_counts[0]
+
+    def test_add_board(self):
+        stats = DiceStats()
+        stats.add_board([['C', 'A'], ['X', 'T']],
+                        [[(0, 0), (0, 1), (1, 1)]])
+        stats.add_board([['X', 'X'], ['X', 'X']], [])
+        assert stats.boards == 2 and stats.dead_boards == 1
+        assert stats.scores == Counter({9: 1, 0: 1})
+        assert stats.face_usage() == {'C': 1, 'A': 1, 'T': 1, 'X': 0}
+
+    def test_intervals(self):
+        mean, low, high = mean_interval(Counter({1: 50, 3: 50}))
+        assert mean == 2 and math.isclose(high - mean, mean - low)
+        assert 0.39 < high - low < 0.4
+        rate, low, high = wilson_interval(0, 2000)
+        assert rate == 0 and low == 0 and 0.001 < high < 0.002
+        assert percentile(Counter({1: 1, 2: 8, 10: 1}), 0.5) == 2
+
+    def test_no_boards(self, tmp_path):
+        assert format_report(DiceStats()) == "0 boards"
+        with pytest.raises(ValueError):
+            analyze_dice(DICE, 0, write_dict(tmp_path))
@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+from engine_diff import random_board, run_differential
+from ex11_utils import (ONE_PATH_PER_WORD, REFERENCE_ENGINE,
+                        find_length_n_paths, find_length_n_words,
+                        max_score_paths)
+from lexicon import Lexicon
+
+
+WORDS = ['QUIT', 'QUITE', 'TIE', 'TOE', 'SIT', 'SET', 'TEN', 'NET', 'ONE',
+         'NOSE', 'TONE', 'STONE', 'NOTES', 'SEEN', 'TREE', 'RATE', 'EAT']
+BOARD = [['QU', 'I', 'T'],
+         ['E', 'S', 'E'],
+         ['N', 'O', 'T']]
+
+
+class TestEngines:
+
+    def test_reference_engine_matches(self):
+        for n in range(1, 6):
+            assert sorted(find_length_n_words(n, BOARD, WORDS,
+                                              engine=REFERENCE_ENGINE)) == \
+                   sorted(find_length_n_words(n, BOARD, WORDS))
+        assert max_score_paths(BOARD, WORDS, engine=REFERENCE_ENGINE) == \
+               max_score_paths(BOARD, WORDS)
+        assert find_length_n_paths(3, BOARD, WORDS, compact=True,
+                                   engine=REFERENCE_ENGINE) == \
+               find_length_n_paths(3, BOARD, WORDS, compact=True)
+
+    def test_unknown_engine_or_mode(self):
+        with pytest.raises(ValueError):
+            max_score_paths(BOARD, WORDS, engine='nope')
+        with pytest.raises(ValueError):
+            find_length_n_words(3, BOARD, WORDS, mode=ONE_PATH_PER_WORD,
+                                engine=REFERENCE_ENGINE)
+
+    def test_differential_run(self):
+        rng = random.Random(3)
+        boards = [random_board(rng, max_side=4) for _ in range(30)]
+        report = run_differential(boards, Lexicon(WORDS), lengths=(2, 3, 4))
+        assert report.boards == 30
+        assert report.mismatches == []
+        assert set(report.seconds) == {'reference', 'fast'}
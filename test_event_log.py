@@ -0,0 +1,91 @@
+import boggle
+from event_log import (EventLogWriter, read_events, NEW_GAME, CLICK_TILE,
+                       SET_PATH)
+from replay_validator import replay_log, summarize_logs
+
+
+BOARD = [['C', 'A', 'T', 'Q'],
+         ['D', 'O', 'G', 'Q'],
+         ['B', 'I', 'T', 'Q'],
+         ['Q', 'Q', 'Q', 'QU']]
+
+
+def play(writer, clicks_per_word):
+    writer.new_game(BOARD)
+    for clicks in clicks_per_word:
+        for y, x in clicks:
+            writer.record("click_tile", {"y": y, "x": x})
+        writer.record("add_word", None)
+
+
+class FakeGUI:
+    """Stands for the GUI of a game, ignoring every update."""
+
+    def __init__(self, controller, board, instrumentation):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args: None
+
+
+class TestEventLog:
+
+    def test_round_trip(self, tmp_path):
+        log = str(tmp_path / "games.log")
+        with EventLogWriter(log) as writer:
+            play(writer, [[(0, 0), (0, 1)]])
+            writer.record("quit_game", None)
+        with open(log, "rb") as f:
+            events = list(read_events(f, chunk_size=3))
+        assert events[0] == (NEW_GAME, 0, BOARD)
+        assert [(kind, data) for kind, _, data in events[1:3]] == \
+               [(CLICK_TILE, (0, 0)), (CLICK_TILE, (0, 1))]
+        assert len(events) == 5
+
+    def test_replay_scores_like_boggle(self, tmp_path):
+        log = str(tmp_path / "games.log")
+        with EventLogWriter(log) as writer:
+            # CAT, DOG with an ignored far click, CAT again, and a non word.
+            play(writer, [[(0, 0), (0, 1), (0, 2)],
+                          [(1, 0), (1, 1), (3, 3), (1, 2)],
+                          [(0, 0), (0, 1), (0, 2)],
+                          [(2, 0), (2, 1)]])
+        with EventLogWriter(log) as writer:
+            play(writer, [[(3, 2), (3, 3)]])
+        words = {'CAT', 'DOG', 'QQU'}
+        games = list(replay_log(log, words, chunk_size=5))
+        assert [(game.words, game.score, game.submissions)
+                for game in games] == [(['CAT', 'DOG'], 18, 4),
+                                       (['QQU'], 9, 1)]
+
+    def test_summarize_in_processes(self, tmp_path):
+        dict_path = tmp_path / "dict.txt"
+        dict_path.write_text("CAT\nDOG\n")
+        logs = []
+        for i in range(3):
+            logs.append(str(tmp_path / f"{i}.log"))
+            with EventLogWriter(logs[-1]) as writer:
+                play(writer, [[(0, 0), (0, 1), (0, 2)]] * (i + 1))
+        summaries = summarize_logs(logs, str(dict_path), processes=2)
+        assert [tuple(summaries[log]) for log in logs] == \
+               [(1, 1, 1, 9), (1, 2, 1, 9), (1, 3, 1, 9)]
+
+    def test_typed_then_clicked_word(self, tmp_path, monkeypatch):
+        log = str(tmp_path / "games.log")
+        monkeypatch.setattr(boggle, "GUI", FakeGUI)
+        monkeypatch.setattr(boggle, "randomize_board",
+                            lambda: [['C', 'A', 'Q'], ['Q', 'Q', 'T']])
+        game = boggle.Boggle(['CAT'], event_log=log)
+        game._Boggle__setup_game()
+        for letter in 'CA':
+            assert game.event_from_gui("type_letter", {"letter": letter})
+        assert game.event_from_gui("click_tile", {"y": 1, "x": 2})
+        game.event_from_gui("add_word", None)
+        game._Boggle__event_log.close()
+        with open(log, "rb") as f:
+            events = list(read_events(f))
+        assert [(kind, data) for kind, _, data in events[1:4]] == \
+               [(SET_PATH, [(0, 0)]), (SET_PATH, [(0, 0), (0, 1)]),
+                (CLICK_TILE, (1, 2))]
+        [replayed] = replay_log(log, {'CAT'})
+        assert (replayed.words, replayed.score) == (['CAT'], 9)
@@ -1,4 +1,6 @@
+import ex11_utils
 from ex11_utils import *
+from compact_paths import encode_path, decode_path
 import os
 
 TEST_DICT_ROOT = "test-dicts"
@@ -139,6 +141,16 @@ class TestIsValidPath:
         word_dict = {'CAT': True, 'DOG': True, 'BIT': True}
         path = [(0, 0), (0, 1), (2, 2)]
         assert is_valid_path(board, path, word_dict) is None
+
+    def test_row_end_not_adjacent_to_next_row(self):
+        board = [['Q', 'Q', 'C', 'A'],
+                 ['T', 'Q', 'Q', 'Q']]
+        word_dict = {'CAT': True}
+        # Cells 3 and 4 follow each other but are not adjacent.
+        assert is_valid_path(board, [(0, 2), (0, 3), (1, 0)],
+                             word_dict) is None
+        assert not is_valid_partial_path(board, [(0, 3), (1, 0)])
+        assert is_valid_partial_path(board, [(0, 3), (1, 2)])
         
 
     def test_negative_coordinates(self):
@@ -785,4 +797,354 @@ class TestFindWords:
 test_find_words=TestFindWords()
 test_find_words.test_palindrome()
 test_find_words.test_single_letter_word()
-test_find_words.test_multi_letter_cells()
\ No newline at end of file
+test_find_words.test_multi_letter_cells()
+
+# noinspection Duplicates
+class TestCompactPaths:
+
+    def test_same_paths_as_lists(self):
+        board = [['D', 'O', 'T', 'Q'],
+                 ['O', 'Q', 'O', 'Q'],
+                 ['G', 'Q', 'B', 'Q'],
+                 ['Q', 'Q', 'Q', 'Q']]
+        word_dict = {'DOT': True, 'DOG': True, 'BOT': True}
+        paths = find_length_n_paths(3, board, word_dict)
+        compact = find_length_n_paths(3, board, word_dict, compact=True)
+        assert len(compact) == len(paths)
+        assert sorted(compact) == sorted(paths)
+        assert sorted(find_length_n_words(3, board, word_dict,
+                                          compact=True).to_list()) == \
+               sorted(paths)
+
+    def test_set_operations(self):
+        board = [['C', 'A', 'T', 'Q'],
+                 ['D', 'O', 'G', 'Q'],
+                 ['B', 'I', 'T', 'Q'],
+                 ['Q', 'Q', 'Q', 'Q']]
+        cat, dog = [(0, 0), (0, 1), (0, 2)], [(1, 0), (1, 1), (1, 2)]
+        first = PathSet.for_board(board, [cat, dog, cat])
+        second = PathSet.for_board(board, [dog])
+        assert len(first) == 2
+        assert list(first & second) == [dog]
+        assert list(first - second) == [cat]
+        assert (second | first).to_list() == [dog, cat]
+        assert cat in first and cat not in second
+
+    def test_packed_paths(self):
+        paths = [[divmod(first, 4), divmod(second, 4)]
+                 for first in range(16) for second in range(16)
+                 if first != second]
+        packed = PathSet(4, 4, paths + paths)
+        assert len(packed) == 240 and packed.to_list() == paths
+        for path in paths[::2]:
+            packed.discard(path)
+        assert len(packed) == 120 and paths[0] not in packed
+        assert packed.to_list() == paths[1::2]
+        # Growing the hash table drops the removed paths.
+        for path in paths[::2]:
+            packed.add(path)
+        assert packed.to_list() == paths[1::2] + paths[::2]
+        assert packed == PathSet(4, 4, paths)
+        # The removed paths are not kept packed, at most the hash table is
+        # twice as big.
+        assert packed.memory_bytes() < 2 * PathSet(4, 4, paths).memory_bytes()
+
+    def test_wide_boards(self):
+        board = [['A'] * 20 for _ in range(20)]
+        path = [(19, 19), (18, 18), (0, 0)]
+        paths = PathSet.for_board(board, [path])
+        assert next(paths.codes()) == encode_path(path, 20, wide=True)
+        assert list(paths) == [path]
+        assert decode_path(encode_path(path, 20, wide=True), 20, True) == path
+
+
+# noinspection Duplicates
+class TestCounting:
+
+    def test_counts_match_paths(self):
+        board = [['D', 'O', 'T', 'Q'],
+                 ['O', 'QU', 'O', 'Q'],
+                 ['G', 'IT', 'B', 'Q'],
+                 ['Q', 'Q', 'Q', 'Q']]
+        word_dict = {'DOT': True, 'DOG': True, 'BOT': True, 'QUIT': True,
+                     'OQUIT': True, 'BOO': True, 'TO': True}
+        for n in range(6):
+            assert count_length_n_paths(n, board, word_dict) == \
+                   len(find_length_n_paths(n, board, word_dict))
+            assert count_length_n_words(n, board, word_dict) == \
+                   len(find_length_n_words(n, board, word_dict))
+
+    def test_word_length_histogram(self):
+        board = [['D', 'O', 'T', 'Q'],
+                 ['O', 'QU', 'O', 'Q'],
+                 ['G', 'IT', 'B', 'Q'],
+                 ['Q', 'Q', 'Q', 'Q']]
+        word_dict = {'DOT', 'DOG', 'BOT', 'QUIT', 'OQUIT', 'TO', 'CAT'}
+        assert word_length_histogram(board, word_dict) == {2: 1, 3: 3,
+                                                           4: 1, 5: 1}
+        assert word_length_histogram(board, set()) == {}
+
+
+class CountingTable:
+    """A table of a lexicon counting its reads."""
+
+    def __init__(self, lexicon, table):
+        self.lexicon = lexicon
+        self.table = table
+
+    def __getitem__(self, node):
+        self.lexicon.reads += 1
+        return self.table[node]
+
+    def __len__(self):
+        return len(self.table)
+
+    def __iter__(self):
+        self.lexicon.reads += len(self.table)
+        return iter(self.table)
+
+
+class CountingLexicon(Lexicon):
+    """A lexicon counting the reads of its tables and words, the work of
+    the searches walking it."""
+
+    reads = 0
+
+    def tables(self):
+        return tuple(CountingTable(self, table) for table in super().tables())
+
+    def __iter__(self):
+        for word in super().__iter__():
+            self.reads += 1
+            yield word
+
+
+# noinspection Duplicates
+class TestModes:
+
+    board = [['A', 'B', 'A', 'Q'],
+             ['B', 'A', 'B', 'Q'],
+             ['A', 'B', 'QU', 'IT'],
+             ['Q', 'Q', 'U', 'I']]
+    word_dict = {'ABA', 'BAB', 'QUIT', 'AB'}
+
+    def test_one_path_per_word(self):
+        all_paths = find_length_n_words(3, self.board, self.word_dict)
+        one_path = find_length_n_words(3, self.board, self.word_dict,
+                                       mode=ONE_PATH_PER_WORD)
+        assert len(all_paths) > 2
+        assert sorted(''.join(self.board[x][y] for x, y in path)
+                      for path in one_path) == ['ABA', 'BAB']
+        assert all(path in all_paths for path in one_path)
+
+    def test_words_only(self):
+        assert sorted(find_length_n_paths(
+            2, self.board, self.word_dict, mode=WORDS_ONLY)) == ['AB', 'QUIT']
+        assert sorted(max_score_paths(
+            self.board, self.word_dict, mode=WORDS_ONLY)) == \
+               ['AB', 'ABA', 'BAB', 'QUIT']
+
+    def test_max_score_keeps_longest_path(self):
+        paths = max_score_paths(self.board, self.word_dict,
+                                mode=ONE_PATH_PER_WORD)
+        assert sorted(len(path) for path in paths) == [2, 3, 3, 3]
+        assert sorted(map(len, paths)) == \
+               sorted(map(len, max_score_paths(self.board, self.word_dict)))
+
+    def test_unknown_mode(self):
+        try:
+            find_length_n_paths(3, self.board, self.word_dict, mode='fast')
+        except ValueError:
+            pass
+        else:
+            assert False
+
+    def test_cost_no_more_than_all_paths(self):
+        lexicon = CountingLexicon(
+            load_words_dict(file_path("boggle_dict.txt"))
+        )
+        board = [['S', 'E', 'R', 'S'],
+                 ['P', 'A', 'T', 'G'],
+                 ['L', 'I', 'N', 'E'],
+                 ['S', 'E', 'R', 'S']]
+
+        def cost(solver, *args, mode):
+            lexicon.reads = 0
+            solver(*args, board, lexicon, mode=mode)
+            return lexicon.reads
+
+        for solver, args in ((find_length_n_words, (3,)),
+                             (find_length_n_paths, (6,)),
+                             (max_score_paths, ())):
+            all_paths = cost(solver, *args, mode=ALL_PATHS)
+            for mode in (ONE_PATH_PER_WORD, WORDS_ONLY):
+                # The one-path modes read the trie where the board leads
+                # them, like ALL_PATHS, never the whole trie: copying its
+                # counts is over 600,000 reads.
+                assert cost(solver, *args, mode=mode) <= 2 * all_paths, \
+                    (solver.__name__, mode)
+
+
+# noinspection Duplicates
+class TestValidatePaths:
+
+    board = [['C', 'A', 'T', 'Q'],
+             ['D', 'O', 'G', 'Q'],
+             ['B', 'I', 'T', 'Q'],
+             ['Q', 'Q', 'Q', 'QU']]
+    word_dict = {'CAT', 'DOG', 'BIT', 'QQU'}
+
+    def test_same_as_is_valid_path(self):
+        paths = [[(0, 0), (0, 1), (0, 2)],
+                 [(0, 0), (0, 1)],
+                 [],
+                 [(0, 0), (0, 1), (0, 0)],
+                 [(0, 0), (0, 1), (2, 2)],
+                 [(0, -2), (0, -1), (0, 0)],
+                 [(0, 4), (0, 3), (0, 2)],
+                 [(2, 0), (2, 1), (2, 2)],
+                 [(3, 2), (3, 3)],
+                 [(0, 0), (0, 1), (0, 2)]]
+        assert validate_paths(self.board, paths, self.word_dict) == \
+               [is_valid_path(self.board, path, self.word_dict)
+                for path in paths]
+
+    def test_padded_cell_indices(self):
+        paths = [[0, 1, 2, -1],
+                 [4, 5, 6, -1],
+                 [4, 5, 16, -1],
+                 [14, 15, -1, -1],
+                 [-1, -1, -1, -1]]
+        assert validate_paths(self.board, paths, self.word_dict) == \
+               ['CAT', 'DOG', None, 'QQU', None]
+
+    def test_list_tiles(self):
+        # Decoded JSON submissions hold lists, not tuples.
+        paths = [[[0, 0], [0, 1], [0, 2]],
+                 [[0, 0], [0, 1], [0, 0]],
+                 [[0, 4], [0, 3], [0, 2]],
+                 [[3, 2], [3, 3]]]
+        assert validate_paths(self.board, paths, self.word_dict) == \
+               [is_valid_path(self.board, path, self.word_dict)
+                for path in paths] == ['CAT', None, None, 'QQU']
+
+    def test_repeated_and_mixed_paths(self):
+        cat = [(0, 0), (0, 1), (0, 2)]
+        paths = [cat, [0, 1, 2], [[0, 0], [0, 1], [0, 2]], cat,
+                 # A path is either pairs or cell indices, not both.
+                 [(0, 0), 1, 2],
+                 [0, (0, 1), (0, 2)],
+                 [(0, 0), (0, 1), (0, 2), -1]]
+        assert validate_paths(self.board, paths, self.word_dict) == \
+               ['CAT', 'CAT', 'CAT', 'CAT', None, None, None]
+
+
+# noinspection Duplicates
+class TestAnytime:
+
+    board = [['C', 'A', 'T', 'Q'],
+             ['D', 'O', 'G', 'Q'],
+             ['B', 'I', 'T', 'Q'],
+             ['QU', 'E', 'E', 'N']]
+    word_dict = {'CAT', 'DOG', 'BIT', 'COD', 'QUEEN', 'TOGA', 'GOAT'}
+
+    def test_complete_within_budget(self):
+        paths, complete = anytime_max_score_paths(self.board,
+                                                  self.word_dict, 10000)
+        assert complete
+        found = max_score_paths(self.board, self.word_dict)
+        assert sorted((is_valid_path(self.board, path, self.word_dict),
+                       len(path)) for path in paths) == \
+               sorted((is_valid_path(self.board, path, self.word_dict),
+                       len(path)) for path in found)
+
+    def test_partial_result_when_out_of_time(self):
+        board = [['A'] * 6 for _ in range(6)]
+        # Words that can't be completed keep every path of A's worth
+        # exploring.
+        word_dict = {'AA', 'AAA'} | {'A' * n + 'B' for n in range(2, 37)}
+        paths, complete = anytime_max_score_paths(board, word_dict, 0)
+        assert not complete
+        assert all(is_valid_path(board, path, word_dict) for path in paths)
+
+
+# noinspection Duplicates
+class TestBlanks:
+
+    board = [['C', '?', 'T', 'Q'],
+             ['D', 'O', 'G', 'Q'],
+             ['B', '?', 'T', 'Q'],
+             ['QU', 'E', 'E', 'N']]
+    word_dict = {'CAT', 'CUT', 'DOG', 'BIT', 'BAT', 'COD', 'QUEEN', 'TOGA',
+                 'GOAT', 'DOTE', 'QUIET', 'ZZZ'}
+
+    def test_same_words_as_every_letter(self):
+        letters = sorted({letter for word in self.word_dict
+                          for letter in word})
+        expected = set()
+        for first in letters:
+            for second in letters:
+                board = [row[:] for row in self.board]
+                board[0][1], board[2][1] = first, second
+                expected.update(max_score_paths(board, self.word_dict,
+                                                mode=WORDS_ONLY))
+        for mode in (ALL_PATHS, ONE_PATH_PER_WORD):
+            paths = max_score_paths(self.board, self.word_dict, mode=mode)
+            assert len(paths) == len(expected)
+        assert sorted(max_score_paths(self.board, self.word_dict,
+                                      mode=WORDS_ONLY)) == sorted(expected)
+        paths, complete = anytime_max_score_paths(self.board, self.word_dict)
+        assert complete and len(paths) == len(expected)
+
+    def test_length_n(self):
+        assert sorted(find_length_n_words(3, self.board, self.word_dict,
+                                          mode=WORDS_ONLY)) == \
+               ['BAT', 'BIT', 'CAT', 'COD', 'CUT', 'DOG']
+        assert count_length_n_paths(5, self.board, self.word_dict) == \
+               len(find_length_n_paths(5, self.board, self.word_dict))
+
+    def test_max_score_words(self):
+        for mode in (ALL_PATHS, ONE_PATH_PER_WORD):
+            found = max_score_words(self.board, self.word_dict, mode=mode)
+            # CAT and CUT share their path, the blank stands for A or U.
+            assert dict(found)['CAT'] == dict(found)['CUT'] == \
+                   [(0, 0), (0, 1), (0, 2)]
+            assert [path for _, path in found] == \
+                   max_score_paths(self.board, self.word_dict, mode=mode)
+
+
+class TestFindWordPath:
+
+    board = [['C', 'A', 'T', 'Q'],
+             ['D', 'O', 'G', 'S'],
+             ['B', '?', 'T', 'Q'],
+             ['QU', 'E', 'E', 'N']]
+    word_dict = ['CAT', 'CATS', 'DOG', 'DOGS', 'GOAT', 'QUEEN', 'BIT',
+                 'COD', 'TOGA', 'ZZZ', 'QUIET', 'DOTE']
+
+    def test_find_word_path(self):
+        assert find_word_path(self.board, 'CAT') == [(0, 0), (0, 1), (0, 2)]
+        assert find_word_path(self.board, 'QUEEN') == \
+               [(3, 0), (3, 1), (3, 2), (3, 3)]
+        path = find_word_path(self.board, 'BIT')
+        assert path == [(2, 0), (2, 1), (2, 2)]
+        assert find_word_path(self.board, 'ZZZ') is None
+        assert find_word_path(self.board, 'CAC') is None
+        assert find_word_path(self.board, '') is None
+        assert find_word_path([], 'CAT') is None
+
+    def test_same_as_max_score_paths(self, monkeypatch):
+        board = [[tile if tile != '?' else 'I' for tile in row]
+                 for row in self.board]
+        expected = {''.join(board[x][y] for x, y in path): len(path)
+                    for path in max_score_paths(board, self.word_dict)}
+        # Both the word driven and the board driven search.
+        for limit in (len(self.word_dict), 0):
+            monkeypatch.setattr(ex11_utils, 'WORD_DRIVEN_MAX_WORDS', limit)
+            found = find_words(board, self.word_dict)
+            assert {word: len(path) for word, path in found.items()} == \
+                   expected
+            for word, path in found.items():
+                assert is_valid_path(board, path, self.word_dict) == word
+        assert find_words(board, Lexicon(self.word_dict)).keys() == \
+               expected.keys()
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+import gui_instrumentation
+from gui_instrumentation import GuiInstrumentation, LatencyHistogram
+
+
+class FakeClock:
+    """Stands for perf_counter, moved forward by the tests."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRoot:
+    """Keeps the callbacks scheduled like a Tk window, run on demand."""
+
+    def __init__(self):
+        self.pending = []
+        self.idle = []
+
+    def after(self, delay_ms, callback):
+        self.pending.append(callback)
+
+    def after_idle(self, callback):
+        self.idle.append(callback)
+
+    def run_next(self):
+        self.pending.pop(0)()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(gui_instrumentation, "perf_counter", clock)
+    return clock
+
+
+class TestLatencyHistogram:
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        assert histogram.percentile(0.5) is None
+        for micros in [3] * 90 + [1000] * 9 + [70000]:
+            histogram.add(micros / 1_000_000)
+        # 3 us falls in [2, 4), 1000 us in [512, 1024), 70000 us in
+        # [65536, 131072).
+        assert histogram.percentile(0.5) == 4 / 1_000_000
+        assert histogram.percentile(0.95) == 1024 / 1_000_000
+        assert histogram.percentile(1.0) == 131072 / 1_000_000
+        data = histogram.to_dict()
+        assert (data["count"], data["min_ms"], data["max_ms"]) == \
+               (100, 0.003, 70.0)
+        assert data["buckets_us"] == {"4": 90, "1024": 9, "131072": 1}
+
+    def test_empty(self):
+        data = LatencyHistogram().to_dict()
+        assert data["count"] == 0 and data["mean_ms"] is None
+        assert data["buckets_us"] == {}
+
+
+class TestGuiInstrumentation:
+
+    def test_events_and_render(self, clock, tmp_path):
+        instrumentation = GuiInstrumentation(str(tmp_path / "gui.jsonl"))
+        root = FakeRoot()
+        start = instrumentation.start()
+        clock.now += 0.002
+        instrumentation.record("click_tile", start)
+        instrumentation.record_after_render(root, "click_tile_render", start)
+        clock.now += 0.003
+        root.idle.pop()()
+        latency = instrumentation.to_dict()["latency"]
+        assert latency["click_tile"]["max_ms"] == pytest.approx(2)
+        assert latency["click_tile_render"]["max_ms"] == pytest.approx(5)
+
+    def test_clock_tick_drift(self, clock, tmp_path):
+        instrumentation = GuiInstrumentation(str(tmp_path / "gui.jsonl"))
+        for interval in (0, 1.0, 1.25, 0.99):
+            clock.now += interval
+            instrumentation.clock_tick(1000)
+        drift = instrumentation.to_dict()["clock_drift"]
+        assert drift["count"] == 3
+        assert drift["max_ms"] == pytest.approx(250)
+        assert drift["min_ms"] == pytest.approx(0)
+
+    def test_stall_watchdog(self, clock, tmp_path, monkeypatch):
+        monkeypatch.setattr(GuiInstrumentation, "MAX_STALLS", 3)
+        instrumentation = GuiInstrumentation(str(tmp_path / "gui.jsonl"))
+        root = FakeRoot()
+        instrumentation.watch(root)
+        interval = GuiInstrumentation.WATCHDOG_INTERVAL_MS / 1000
+        # On time, then late by 50 ms, which is no stall, then 5 stalls.
+        for lateness in [0, 0.05, 0.2, 0.3, 0.4, 0.5, 0.6]:
+            clock.now += interval + lateness
+            root.run_next()
+            assert len(root.pending) == 1
+        # Only the latest stalls are kept.
+        assert instrumentation.to_dict()["stalls_ms"] == \
+               pytest.approx([400, 500, 600])
+
+    def test_dump(self, clock, tmp_path):
+        path = tmp_path / "gui.jsonl"
+        instrumentation = GuiInstrumentation(str(path))
+        instrumentation.dump()
+        assert not path.exists()
+        instrumentation.record("add_word", instrumentation.start())
+        instrumentation.dump()
+        instrumentation.clock_tick(1000)
+        instrumentation.dump()
+        first, second = [json.loads(line)
+                         for line in path.read_text().splitlines()]
+        assert list(first["latency"]) == ["add_word"]
+        # Every dump starts a new game.
+        assert second["latency"] == {} and second["stalls_ms"] == []
@@ -0,0 +1,86 @@
+import random
+
+from ex11_utils import WORDS_ONLY, max_score_paths, word_score
+from incremental_solver import IncrementalSolver
+from lexicon import Lexicon
+
+
+BOARD = [['C', 'A', 'T', 'Q'],
+         ['D', 'O', 'G', 'Q'],
+         ['B', 'I', 'T', 'Q'],
+         ['Q', 'Q', 'Q', 'Q']]
+WORDS = Lexicon(['CAT', 'CATS', 'DOG', 'DOGS', 'BIT', 'BITS', 'COD', 'TOGA',
+                 'GOAT', 'QUIT', 'QUITS', 'SIT', 'ZOO'])
+
+
+class CountingTable:
+    """A table of a lexicon counting its reads."""
+
+    def __init__(self, lexicon, table):
+        self.lexicon = lexicon
+        self.table = table
+
+    def __getitem__(self, node):
+        self.lexicon.reads += 1
+        return self.table[node]
+
+    def __len__(self):
+        return len(self.table)
+
+
+class CountingLexicon(Lexicon):
+    """A lexicon counting the reads of its tables, the work of the searches
+    walking it."""
+
+    reads = 0
+
+    def tables(self):
+        return tuple(CountingTable(self, table) for table in super().tables())
+
+
+def full_score(board):
+    return sum(word_score(word)
+               for word in max_score_paths(board, WORDS, WORDS_ONLY))
+
+
+class TestIncrementalSolver:
+
+    def test_score_delta(self):
+        solver = IncrementalSolver(BOARD, WORDS)
+        assert solver.score == full_score(BOARD) == 4 * 9 + 2 * 16
+        assert solver.set_tile(3, 3, 'S') == 16
+        assert solver.set_tile(0, 0, 'X') == -9 - 9
+        assert sorted(solver.words()) == ['BIT', 'BITS', 'DOG', 'GOAT', 'TOGA']
+        assert solver.board[0][0] == 'X'
+
+    def test_random_changes_match_full_solve(self):
+        rng = random.Random(11)
+        solver = IncrementalSolver(BOARD, WORDS)
+        tiles = ['A', 'C', 'D', 'G', 'I', 'O', 'QU', 'S', 'T', 'Z', '?']
+        for _ in range(100):
+            score = solver.score
+            delta = solver.set_tile(rng.randrange(4), rng.randrange(4),
+                                    rng.choice(tiles))
+            assert solver.score == score + delta == full_score(solver.board)
+
+    def test_less_work_than_solving_again(self):
+        with open('boggle_dict.txt') as f:
+            lexicon = CountingLexicon(f.read().split())
+        solver = IncrementalSolver([['S', 'E', 'R', 'S'],
+                                    ['P', 'A', 'T', 'G'],
+                                    ['L', 'I', 'N', 'E'],
+                                    ['S', 'E', 'R', 'S']], lexicon)
+        rng = random.Random(5)
+        change_reads = solve_reads = 0
+        for _ in range(100):
+            lexicon.reads = 0
+            solver.set_tile(rng.randrange(4), rng.randrange(4),
+                            rng.choice('AEIOURSTLNDGP'))
+            change_reads += lexicon.reads
+            lexicon.reads = 0
+            solved = IncrementalSolver(solver.board, lexicon)
+            solve_reads += lexicon.reads
+            assert solver.score == solved.score
+        # A change only searches again the prefixes through the tile, it
+        # reads about a third of the trie a solve reads.
+        assert 2 * change_reads < solve_reads
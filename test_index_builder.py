@@ -0,0 +1,54 @@
+import random
+import tracemalloc
+
+import index_builder
+from index_builder import build_index, external_sort
+from lexicon import Lexicon
+
+
+WORDS = ['CAT', 'DOG', 'BIT', 'COD', 'CATS', 'DOGMA', 'QUIT', 'ÉCOLE',
+         'ZOO', 'A', 'CAT']
+
+
+class TestIndexBuilder:
+
+    def test_external_sort(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(index_builder, 'MAX_OPEN_RUNS', 2)
+        words = [str(n) for n in range(100)]
+        random.Random(1).shuffle(words)
+        assert list(external_sort(words, chunk_words=7,
+                                  tmp_dir=str(tmp_path))) == sorted(words)
+        # The run files are removed.
+        assert list(tmp_path.iterdir()) == []
+
+    def test_build_index(self, tmp_path):
+        for name, words in (('unsorted', WORDS), ('sorted', sorted(WORDS))):
+            dict_path = tmp_path / f'{name}.txt'
+            dict_path.write_text('\n'.join(words) + '\n', encoding='utf-8')
+            index_path = str(tmp_path / f'{name}.idx')
+            lexicon = build_index(str(dict_path), index_path, chunk_words=3)
+            assert sorted(lexicon) == sorted(set(WORDS))
+            loaded = Lexicon.load(index_path)
+            assert sorted(loaded) == sorted(set(WORDS))
+            assert loaded.completion_lengths() == \
+                   Lexicon(WORDS).completion_lengths()
+
+    def test_memory_bounded_by_chunk(self, tmp_path):
+        rng = random.Random(3)
+        vocabulary = [''.join(rng.choice('ABCDEFGH')
+                              for _ in range(rng.randint(3, 8)))
+                      for _ in range(1000)]
+        dict_path = tmp_path / 'words.txt'
+        dict_path.write_text('\n'.join(rng.choice(vocabulary)
+                                       for _ in range(50000)) + '\n')
+        tracemalloc.start()
+        try:
+            lexicon = build_index(str(dict_path), str(tmp_path / 'words.idx'),
+                                  chunk_words=2000, tmp_dir=str(tmp_path))
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        assert len(lexicon) == len(set(vocabulary))
+        # Holding the 50000 words would take over 3 MiB, the chunks and the
+        # trie of the distinct words a fraction of it.
+        assert peak < 1 << 20
@@ -0,0 +1,140 @@
+import random
+
+import pytest
+
+from ex11_utils import (find_length_n_paths, find_length_n_words,
+                        max_score_paths, WORDS_ONLY)
+from bloom_lexicon import BloomLexicon
+from lexicon import INDEX_MAGIC, NO_COMPLETION, Lexicon, SolutionCache
+
+
+BOARD = [['C', 'A', 'T', 'Q'],
+         ['D', 'O', 'G', 'Q'],
+         ['B', 'I', 'T', 'Q'],
+         ['Q', 'Q', 'Q', 'Q']]
+
+
+class TestLexicon:
+
+    def test_add_remove(self):
+        lexicon = Lexicon(['CAT', 'CATS', 'DOG'])
+        assert len(lexicon) == 3
+        assert 'CAT' in lexicon and 'CA' not in lexicon
+        assert lexicon.has_prefix('CA') and 'CAT' in lexicon.prefixes
+        assert lexicon.remove('CAT') and not lexicon.remove('CAT')
+        assert 'CAT' not in lexicon and lexicon.has_prefix('CAT')
+        assert lexicon.remove('CATS')
+        assert not lexicon.has_prefix('C')
+        assert lexicon.add('COD') and not lexicon.add('COD')
+        assert sorted(lexicon) == ['COD', 'DOG']
+        assert lexicon.max_word_length == 3
+
+    def test_add_in_any_order(self):
+        rng = random.Random(2)
+        words = {''.join(rng.choice('ABCDE')
+                         for _ in range(rng.randint(1, 6)))
+                 for _ in range(300)}
+        lexicon = Lexicon()
+        # Adding moves the children of nodes to make room for new ones.
+        for word in words:
+            assert lexicon.add(word)
+        assert sorted(lexicon) == sorted(words)
+        assert all(lexicon.word_at(lexicon.node_of(word)) == word
+                   for word in words)
+        assert sorted(max_score_paths(BOARD, lexicon)) == \
+               sorted(max_score_paths(BOARD, Lexicon(words)))
+
+    def test_index_file(self, tmp_path):
+        path = tmp_path / "words.idx"
+        Lexicon(['CAT', 'CATS', 'DOG']).save(str(path))
+        data = path.read_bytes()
+        assert data.startswith(INDEX_MAGIC)
+        loaded = Lexicon.load(str(path))
+        for word in ['COD', 'DOGS', 'ÉTÉ', 'CA']:
+            assert loaded.add(word)
+        assert sorted(loaded) == ['CA', 'CAT', 'CATS', 'COD', 'DOG', 'DOGS',
+                                  'ÉTÉ']
+        for bad in (data[:-2], b'BGLEX\x02' + data[len(INDEX_MAGIC):]):
+            path.write_bytes(bad)
+            with pytest.raises(ValueError):
+                Lexicon.load(str(path))
+
+    def test_used_by_solvers(self):
+        words = ['CAT', 'DOG', 'BIT', 'COD', 'CATS']
+        lexicon = Lexicon(words)
+        assert sorted(find_length_n_words(3, BOARD, lexicon)) == \
+               sorted(find_length_n_words(3, BOARD, set(words)))
+        lexicon.remove('COD')
+        assert len(max_score_paths(BOARD, lexicon)) == 3
+
+    def test_completion_lengths(self, tmp_path):
+        lexicon = Lexicon(['CAT', 'CATS', 'COD', 'DOGMA'])
+        shortest, longest = lexicon.completion_lengths()
+        c = lexicon.node_of('C')
+        assert (shortest[c], longest[c]) == (2, 3)
+        assert (shortest[0], longest[0]) == (3, 5)
+        lexicon.remove('COD')
+        lexicon.add('CATSUP')
+        shortest, longest = lexicon.completion_lengths()
+        assert (shortest[c], longest[c]) == (2, 5)
+        assert shortest[lexicon.node_of('CO')] == NO_COMPLETION
+        path = str(tmp_path / "words.idx")
+        lexicon.save(path)
+        assert Lexicon.load(path).completion_lengths() == (shortest, longest)
+
+    def test_exact_length_pruning_with_long_tiles(self):
+        board = [['QU', 'I', 'E'],
+                 ['T', 'S', 'T'],
+                 ['E', 'A', 'B']]
+        words = ['QUIT', 'QUITS', 'QUIET', 'QUITE', 'QUIETEST', 'SIT']
+        # QUIT takes 3 tiles and QUIET 4, although they spell 4 and 5
+        # letters.
+        assert sorted(find_length_n_paths(3, board, Lexicon(words),
+                                          mode=WORDS_ONLY)) == ['QUIT', 'SIT']
+        assert sorted(find_length_n_words(5, board, Lexicon(words),
+                                          mode=WORDS_ONLY)) == \
+               ['QUIET', 'QUITE', 'QUITS']
+
+    def test_solution_cache_updates_single_words(self):
+        lexicon = Lexicon(['CAT', 'DOG'])
+        cache = SolutionCache(lexicon)
+        assert sorted(cache.solve(BOARD)) == ['CAT', 'DOG']
+        lexicon.remove('CAT')
+        lexicon.add('BIT')
+        lexicon.add('BITS')
+        assert cache.solve(BOARD) == {'DOG': [(1, 0), (1, 1), (1, 2)],
+                                      'BIT': [(2, 0), (2, 1), (2, 2)]}
+        cache.close()
+        lexicon.add('COD')
+        assert 'COD' not in cache.solve(BOARD)
+
+    def test_solution_cache_on_blank_tiles(self):
+        board = [['C', '?', 'T'], ['Q', 'Q', 'Q']]
+        lexicon = Lexicon(['CAT', 'CUT'])
+        cache = SolutionCache(lexicon)
+        path = [(0, 0), (0, 1), (0, 2)]
+        assert cache.solve(board) == {'CAT': path, 'CUT': path}
+        lexicon.add('COT')
+        assert cache.solve(board)['COT'] == path
+        cache.close()
+
+
+class TestBloomLexicon:
+
+    def test_same_results_as_lexicon(self, tmp_path):
+        words = ['CAT', 'DOG', 'BIT', 'COD', 'CATS', 'DOGMA', 'QQQQ', 'TOG']
+        path = str(tmp_path / "words")
+        BloomLexicon.build(words, path, false_positive_rate=0.3)
+        bloom = BloomLexicon.load(path, max_nodes=5)
+        assert len(bloom) == len(words) and sorted(bloom) == sorted(words)
+        assert 'DOG' in bloom and 'DO' not in bloom and 'XYZ' not in bloom
+        for _ in range(2):
+            assert sorted(max_score_paths(BOARD, bloom)) == \
+                   sorted(max_score_paths(BOARD, Lexicon(words)))
+        # The nodes expanded past max_nodes are dropped, only the root
+        # is left.
+        _, check, _, _ = bloom.tables()
+        assert len(check) == 1
+        assert sorted(find_length_n_words(3, BOARD, bloom,
+                                          mode=WORDS_ONLY)) == \
+               ['BIT', 'CAT', 'COD', 'DOG', 'TOG']
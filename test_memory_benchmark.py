@@ -0,0 +1,28 @@
+from memory_benchmark import StepMemory, compare, measure, run_benchmark
+
+
+class TestMemoryBenchmark:
+
+    def test_measure(self):
+        result, memory = measure(lambda: bytearray(8 << 20))
+        assert len(result) == 8 << 20
+        assert memory.traced_peak >= 8 << 20
+
+    def test_run_benchmark(self, tmp_path):
+        path = tmp_path / "words.txt"
+        path.write_text("SEA\nSEAT\nQUIT\nQUITE\nRANDOM\n")
+        results = run_benchmark(str(path))
+        assert list(results) == ["load_dictionary", "build_index",
+                                 "find_length_n_paths", "max_score_paths"]
+        assert all(memory.traced_peak > 0 for memory in results.values())
+
+    def test_compare(self):
+        mib = 1 << 20
+        baseline = {"build_index": StepMemory(100 * mib, 200 * mib),
+                    "tiny": StepMemory(1000, 0)}
+        results = {"build_index": StepMemory(105 * mib, 300 * mib),
+                   "tiny": StepMemory(5000, 0)}
+        assert compare(results, baseline, tolerance=10) == []
+        assert len(compare(results, baseline, tolerance=4)) == 1
+        assert len(compare(results, baseline, tolerance=10,
+                           rss_tolerance=25)) == 1
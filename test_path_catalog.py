@@ -0,0 +1,59 @@
+import random
+from itertools import permutations
+
+import pytest
+
+from ex11_utils import (
+    count_length_n_paths,
+    find_length_n_paths,
+    is_valid_partial_path,
+)
+from lexicon import Lexicon
+from path_catalog import PathCatalog
+
+WORDS = ['CAT', 'CATS', 'DOG', 'DOGS', 'GOAT', 'TOGA', 'QUIT', 'QUITS',
+         'ACT', 'TACO', 'COAT', 'SAG', 'GAS', 'AT', 'TO', 'A']
+TILES = ['C', 'A', 'T', 'S', 'D', 'O', 'G', 'QU', 'I', '?']
+
+
+class TestPathCatalog:
+    def test_all_legal_paths(self):
+        catalog = PathCatalog.build(2, 3, 6)
+        cells = [(x, y) for x in range(2) for y in range(3)]
+        for length in range(1, 7):
+            expected = [list(p) for p in permutations(cells, length)
+                        if is_valid_partial_path([[''] * 3] * 2, list(p))]
+            paths = list(catalog.paths(length))
+            assert sorted(paths) == sorted(expected)
+            assert catalog.count(length) == len(paths)
+        assert catalog.count(7) == 0
+
+    def test_same_as_search(self, tmp_path):
+        PathCatalog.build(3, 4, 7).save(str(tmp_path / "3x4.paths"))
+        catalog = PathCatalog.load(str(tmp_path / "3x4.paths"))
+        assert catalog.shape == (3, 4) and catalog.max_length == 7
+        lexicon = Lexicon(WORDS)
+        rng = random.Random(2)
+        for _ in range(30):
+            board = [[rng.choice(TILES) for _ in range(4)] for _ in range(3)]
+            for n in range(1, 8):
+                expected = find_length_n_paths(n, board, lexicon)
+                paths = catalog.find_length_n_paths(n, board, lexicon)
+                if any('?' in row for row in board):
+                    paths, expected = sorted(paths), sorted(expected)
+                assert paths == expected
+                assert count_length_n_paths(n, board, WORDS, catalog) == \
+                       len(expected)
+        catalog.close()
+
+    def test_errors(self, tmp_path):
+        catalog = PathCatalog.build(2, 2, 3)
+        board = [['C', 'A'], ['T', 'S']]
+        assert catalog.count_length_n_paths(3, board, WORDS) == 2
+        with pytest.raises(ValueError):
+            catalog.count_length_n_paths(4, board, WORDS)
+        with pytest.raises(ValueError):
+            catalog.find_length_n_paths(2, [['C', 'A', 'T']], WORDS)
+        (tmp_path / "bad").write_bytes(b"not a catalog")
+        with pytest.raises(ValueError):
+            PathCatalog.load(str(tmp_path / "bad"))
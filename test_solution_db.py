@@ -0,0 +1,46 @@
+from solution_db import SolutionDatabase
+
+
+BOARD_1 = [['C', 'A', 'T', 'Q'],
+           ['D', 'O', 'G', 'Q'],
+           ['B', 'I', 'T', 'Q'],
+           ['Q', 'Q', 'Q', 'Q']]
+BOARD_2 = [['D', 'O', 'G', 'Q'],
+           ['Q', 'Q', 'Q', 'Q'],
+           ['Q', 'Q', 'Q', 'Q'],
+           ['Q', 'Q', 'Q', 'Q']]
+WORDS = {'CAT', 'DOG', 'BIT', 'CATS', 'COD', 'DOGMA'}
+
+
+class TestSolutionDatabase:
+
+    def test_solve_corpus(self):
+        with SolutionDatabase() as db:
+            assert db.solve_corpus([BOARD_1, BOARD_2], WORDS) == 2
+            assert db.solve_corpus([BOARD_1], WORDS) == 0
+            assert len(db) == 2
+            assert BOARD_1 in db
+            assert db.board_score(BOARD_1) == 4 * 9
+            assert db.board_score(BOARD_2) == 9
+
+    def test_queries(self):
+        with SolutionDatabase() as db:
+            db.solve_corpus([BOARD_1, BOARD_2], WORDS, batch_size=1)
+            assert db.boards_containing('DOG') == [BOARD_1, BOARD_2]
+            assert db.boards_containing('BIT') == [BOARD_1]
+            assert db.boards_containing('DOGMA') == []
+            assert db.boards_with_score_above(10) == [(BOARD_1, 36)]
+            best = db.best_word_per_board()
+            assert [(word, score) for _, word, _, score in best] == \
+                   [('BIT', 9), ('DOG', 9)]
+            assert ('COD', [(0, 0), (1, 1), (1, 0)], 9) in \
+                   db.board_words(BOARD_1)
+
+    def test_blank_tiles(self):
+        board = [['C', '?', 'T'], ['Q', 'Q', 'Q']]
+        with SolutionDatabase() as db:
+            db.solve_corpus([board], {'CAT', 'CUT'})
+            path = [(0, 0), (0, 1), (0, 2)]
+            assert sorted(db.board_words(board)) == \
+                   [('CAT', path, 9), ('CUT', path, 9)]
+            assert db.boards_containing('CUT') == [board]
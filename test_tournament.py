@@ -0,0 +1,33 @@
+from tournament import PlayerResult, Standing, score_round, standings
+
+
+BOARD = [['C', 'A', 'T', 'Q'],
+         ['D', 'O', 'G', 'Q'],
+         ['B', 'I', 'T', 'Q'],
+         ['Q', 'Q', 'Q', 'Q']]
+WORDS = {'CAT', 'DOG', 'BIT', 'COD', 'DOGMA'}
+
+
+class TestTournament:
+
+    def test_score_round(self):
+        results = score_round(BOARD, {
+            'ann': ['CAT', 'dog', 'DOG', 'DOGMA', 'XYZ'],
+            'bob': ['DOG', 'BIT'],
+            'cid': [],
+        }, WORDS)
+        # DOG is found by two players and scores for neither of them.
+        assert results == {
+            'ann': PlayerResult(9, 2, 1, 2),
+            'bob': PlayerResult(9, 2, 1, 0),
+            'cid': PlayerResult(0, 0, 0, 0),
+        }
+
+    def test_standings(self):
+        first = score_round(BOARD, {'ann': ['CAT'], 'bob': ['COD']}, WORDS)
+        second = score_round(BOARD, {'ann': ['BIT'], 'cid': ['DOG']}, WORDS)
+        assert standings([first, second]) == [
+            Standing(1, 'ann', 18, 2, 2, 0),
+            Standing(2, 'bob', 9, 1, 1, 0),
+            Standing(2, 'cid', 9, 1, 1, 0),
+        ]
@@ -0,0 +1,126 @@
+"""
+Tournament scoring.
+
+In a tournament every player of a round plays the same board, and a word
+scores only for a player who is the only one to find it. The input of the
+command line is one JSON line per round:
+
+    {"board": [["C", "A", "T"], ...], "players": {"ann": ["CAT", ...], ...}}
+
+and the standings of all the rounds are printed.
+"""
+import argparse
+import json
+import sys
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, NamedTuple
+
+from ex11_utils import WORDS_ONLY, Board, max_score_paths, word_score
+
+
+class PlayerResult(NamedTuple):
+    """The outcome of a player in a round or in the whole tournament."""
+
+    score: int
+    valid: int
+    unique: int
+    invalid: int
+
+
+class Standing(NamedTuple):
+    """A line of the standings. Players with the same score share a rank."""
+
+    rank: int
+    player: str
+    score: int
+    valid: int
+    unique: int
+    invalid: int
+
+
+def score_round(
+    board: Board, submissions: Mapping[str, Iterable[str]], words: Iterable[str]
+) -> Dict[str, PlayerResult]:
+    """
+    Scores the words every player submitted for a board.
+    The board is solved once and every submission is checked against its
+    words, then the words are counted over all the players in a hash table.
+    A valid word scores len(word) ** 2 for its player if no other player
+    found it, and zero otherwise. A word submitted twice by a player counts
+    once, and case is ignored.
+    :param board: two dimensional list of strings representing the board.
+    :param submissions: dict from every player to the words they submitted.
+    :param words: the words that are accepted in the game.
+    :return: dict from every player to their result.
+    """
+    board_words = set(max_score_paths(board, words, WORDS_ONLY))
+    found: Dict[str, set] = {}
+    invalid: Dict[str, int] = {}
+    finders: Counter = Counter()
+    for player, submitted in submissions.items():
+        distinct = {word.strip().upper() for word in submitted}
+        valid = distinct & board_words
+        found[player] = valid
+        invalid[player] = len(distinct) - len(valid)
+        finders.update(valid)
+
+    results = {}
+    for player, valid in found.items():
+        unique = [word for word in valid if finders[word] == 1]
+        results[player] = PlayerResult(
+            sum(word_score(word) for word in unique),
+            len(valid),
+            len(unique),
+            invalid[player],
+        )
+    return results
+
+
+def standings(rounds: Iterable[Mapping[str, PlayerResult]]) -> List[Standing]:
+    """
+    Sums the results of the rounds of a tournament and ranks the players.
+    :param rounds: the results of every round, as score_round returns them.
+    :return: the standings, best score first and ties by player name.
+    """
+    totals: Dict[str, PlayerResult] = {}
+    for results in rounds:
+        for player, result in results.items():
+            total = totals.get(player)
+            totals[player] = result if total is None else PlayerResult(
+                *(a + b for a, b in zip(total, result))
+            )
+
+    ordered = sorted(totals.items(), key=lambda item: (-item[1].score, item[0]))
+    table = []
+    for position, (player, total) in enumerate(ordered, 1):
+        if table and table[-1].score == total.score:
+            rank = table[-1].rank
+        else:
+            rank = position
+        table.append(Standing(rank, player, *total))
+    return table
+
+
+if __name__ == "__main__":
+    from boggle_solve import DEFAULT_DICT, load_lexicon
+
+    parser = argparse.ArgumentParser(
+        description="Score tournament rounds read as JSON lines from stdin."
+    )
+    parser.add_argument("--dict", default=DEFAULT_DICT)
+    parser.add_argument(
+        "--index", help="prebuilt index, <dict>.idx by default"
+    )
+    args = parser.parse_args()
+
+    lexicon = load_lexicon(args.dict, args.index)
+    rounds = [
+        score_round(record["board"], record["players"], lexicon)
+        for record in map(json.loads, filter(str.strip, sys.stdin))
+    ]
+    for line in standings(rounds):
+        print(
+            f"{line.rank:>4} {line.player}: {line.score} points,"
+            f" {line.unique} unique of {line.valid} valid words,"
+            f" {line.invalid} invalid"
+        )